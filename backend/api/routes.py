@@ -1,5 +1,8 @@
 """API routes for the comprehensive poker solver."""
-from fastapi import APIRouter, HTTPException
+import asyncio
+import json
+from fastapi import APIRouter, HTTPException, Response
+from pydantic import BaseModel
 from models.api_models import (
     SolverRequest, SolverResponse, PostflopRequest, PostflopResponse,
     GameConfigRequest, GameConfigResponse
@@ -11,32 +14,73 @@ router = APIRouter()
 solver_service = SolverService()
 comprehensive_solver_service = ComprehensiveSolverService()
 
+# Static payloads are serialized once at import instead of on every request
+_ROOT_INFO_JSON = json.dumps({
+    "message": "Comprehensive 2-Player CFR GTO Solver",
+    "version": "2.0.0",
+    "status": "ready",
+    "features": [
+        "Full postflop game tree support",
+        "Monte Carlo equity calculations",
+        "User-configurable bet sizes",
+        "User-configurable max bets per street",
+        "Convergence tracking",
+        "Board texture analysis",
+        "Hand strength analysis",
+        "Game configuration validation"
+    ]
+}).encode()
+
+_SOLVER_INFO_JSON = json.dumps({
+    "solver_type": "Comprehensive CFR GTO Solver",
+    "version": "2.0.0",
+    "capabilities": {
+        "preflop": True,
+        "postflop": True,
+        "user_configurable_bet_sizes": True,
+        "user_configurable_max_bets": True,
+        "multiple_bet_sizes": True,
+        "convergence_tracking": True,
+        "monte_carlo_equity": True,
+        "board_texture_analysis": True,
+        "hand_strength_analysis": True,
+        "range_vs_range": True,
+        "game_config_validation": True
+    },
+    "default_bet_sizes": [0.33, 0.5, 0.75, 1.0, 1.5, 2.0],
+    "default_max_bets_per_street": {
+        "preflop": 4,
+        "flop": 3,
+        "turn": 2,
+        "river": 1
+    },
+    "max_iterations": 1000000,
+    "convergence_threshold": 0.001,
+    "monte_carlo_simulations": 10000
+}).encode()
+
+
+def _json_response(model: BaseModel) -> Response:
+    """Serialize a response model straight to JSON bytes in pydantic-core.
+    
+    Returning a Response skips FastAPI re-validating the model against
+    response_model and dumping it to dicts before encoding; response_model
+    still documents the schema.
+    """
+    return Response(content=model.model_dump_json(), media_type="application/json")
+
 
 @router.get("/")
 async def root():
     """Root endpoint."""
-    return {
-        "message": "Comprehensive 2-Player CFR GTO Solver", 
-        "version": "2.0.0",
-        "status": "ready",
-        "features": [
-            "Full postflop game tree support",
-            "Monte Carlo equity calculations",
-            "User-configurable bet sizes",
-            "User-configurable max bets per street",
-            "Convergence tracking",
-            "Board texture analysis",
-            "Hand strength analysis",
-            "Game configuration validation"
-        ]
-    }
+    return Response(content=_ROOT_INFO_JSON, media_type="application/json")
 
 
 @router.post("/solve", response_model=SolverResponse)
 async def solve_scenario(request: SolverRequest):
     """Solve 2-player poker scenario using basic CFR (legacy endpoint)."""
     try:
-        return solver_service.solve_scenario(request)
+        return _json_response(await asyncio.to_thread(solver_service.solve_scenario, request))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -45,7 +89,7 @@ async def solve_scenario(request: SolverRequest):
 async def solve_comprehensive_scenario(request: SolverRequest):
     """Solve comprehensive 2-player poker scenario with full postflop support."""
     try:
-        return comprehensive_solver_service.solve_comprehensive_scenario(request)
+        return _json_response(await asyncio.to_thread(comprehensive_solver_service.solve_comprehensive_scenario, request))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -54,7 +98,7 @@ async def solve_comprehensive_scenario(request: SolverRequest):
 async def analyze_postflop_spot(request: PostflopRequest):
     """Analyze specific postflop spot with detailed hand analysis."""
     try:
-        return comprehensive_solver_service.analyze_postflop_spot(request)
+        return _json_response(await asyncio.to_thread(comprehensive_solver_service.analyze_postflop_spot, request))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -83,30 +127,4 @@ async def comprehensive_health_check():
 @router.get("/info")
 async def solver_info():
     """Get solver information and capabilities."""
-    return {
-        "solver_type": "Comprehensive CFR GTO Solver",
-        "version": "2.0.0",
-        "capabilities": {
-            "preflop": True,
-            "postflop": True,
-            "user_configurable_bet_sizes": True,
-            "user_configurable_max_bets": True,
-            "multiple_bet_sizes": True,
-            "convergence_tracking": True,
-            "monte_carlo_equity": True,
-            "board_texture_analysis": True,
-            "hand_strength_analysis": True,
-            "range_vs_range": True,
-            "game_config_validation": True
-        },
-        "default_bet_sizes": [0.33, 0.5, 0.75, 1.0, 1.5, 2.0],
-        "default_max_bets_per_street": {
-            "preflop": 4,
-            "flop": 3,
-            "turn": 2,
-            "river": 1
-        },
-        "max_iterations": 1000000,
-        "convergence_threshold": 0.001,
-        "monte_carlo_simulations": 10000
-    } 
\ No newline at end of file
+    return Response(content=_SOLVER_INFO_JSON, media_type="application/json")
\ No newline at end of file
@@ -1,50 +1,45 @@
 """CFR node with regret matching."""
 from typing import Dict, List
+import numpy as np
 
 
 class CFRNode:
     """CFR node with regret matching."""
     
+    __slots__ = ('info_set', 'actions', 'num_actions', 'action_idx',
+                 'regret_sum', 'strategy_sum')
+    
     def __init__(self, info_set: str, actions: List[str]):
         self.info_set = info_set
         self.actions = actions
-        self.regret_sum = {action: 0.0 for action in actions}
-        self.strategy_sum = {action: 0.0 for action in actions}
         self.num_actions = len(actions)
+        self.action_idx = {action: i for i, action in enumerate(actions)}
+        self.regret_sum = np.zeros(self.num_actions, dtype=np.float64)
+        self.strategy_sum = np.zeros(self.num_actions, dtype=np.float64)
     
-    def get_strategy(self, realization_weight: float) -> Dict[str, float]:
-        """Get current strategy using regret matching."""
-        strategy = {}
-        normalizing_sum = 0.0
-        
-        for action in self.actions:
-            strategy[action] = max(self.regret_sum[action], 0.0)
-            normalizing_sum += strategy[action]
+    def get_strategy(self, realization_weight: float) -> np.ndarray:
+        """Get current strategy using regret matching, indexed like self.actions."""
+        strategy = np.maximum(self.regret_sum, 0.0)
+        normalizing_sum = strategy.sum()
         
         if normalizing_sum > 0:
-            for action in self.actions:
-                strategy[action] /= normalizing_sum
+            strategy /= normalizing_sum
         else:
             # Uniform strategy if no positive regrets
-            for action in self.actions:
-                strategy[action] = 1.0 / self.num_actions
+            strategy.fill(1.0 / self.num_actions)
         
         # Update strategy sum
-        for action in self.actions:
-            self.strategy_sum[action] += realization_weight * strategy[action]
+        self.strategy_sum += realization_weight * strategy
         
         return strategy
     
     def get_average_strategy(self) -> Dict[str, float]:
         """Get average strategy over all iterations."""
-        avg_strategy = {}
-        normalizing_sum = sum(self.strategy_sum.values())
+        normalizing_sum = self.strategy_sum.sum()
         
         if normalizing_sum > 0:
-            for action in self.actions:
-                avg_strategy[action] = self.strategy_sum[action] / normalizing_sum
+            avg_strategy = self.strategy_sum / normalizing_sum
         else:
-            for action in self.actions:
-                avg_strategy[action] = 1.0 / self.num_actions
+            avg_strategy = np.full(self.num_actions, 1.0 / self.num_actions)
         
-        return avg_strategy 
\ No newline at end of file
+        return dict(zip(self.actions, avg_strategy.tolist()))
\ No newline at end of file
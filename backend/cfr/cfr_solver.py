@@ -1,184 +1,115 @@
 """2-Player CFR Solver for OOP vs IP."""
-import random
+import numpy as np
 from typing import Dict, List, Tuple
-from models.enums import Position, ActionType
-from models.game_models import GameState, Action
-from core.hand_evaluator import HandEvaluator
+from models.enums import Position, ActionType, Street
+from models.game_models import GameState, Action, Board, HISTORY_HASH_BASE, get_action
 from core.poker_range import PokerRange
-from .cfr_node import CFRNode
+from .game_tree import PublicTree, apply_action_inplace, undo_action_inplace
+from .tree_solver import TreeCFRSolver
+from .vectorized import to_host
 from config.settings import settings
 
 
-class CFRSolver:
-    """2-Player CFR Solver for OOP vs IP."""
+class CFRSolver(TreeCFRSolver):
+    """2-Player CFR Solver for OOP vs IP.
     
-    def __init__(self):
-        self.nodes = {}
-        self.hand_evaluator = HandEvaluator()
-        self.iterations = 0
-        
-    def get_info_set(self, hand: str, history: List[Action], position: Position) -> str:
-        """Create information set string."""
-        history_str = ''.join([str(action) for action in history])
-        return f"{position.value}:{hand}:{history_str}"
+    The betting tree is flattened once per (pot, stack, max_bets) into a
+    PublicTree and traversed by a Numba-compiled kernel. Regrets and strategy
+    sums live in dense float32 tables indexed by info set id
+    (node * num_hands + hand); per-pass reach and utility buffers are float32 too.
+    
+    After each CFR pass the tables are updated according to settings.cfr_variant:
+    "dcfr" discounts accumulated regrets and strategy sums (Discounted CFR),
+    "linear" scales both by t / (t + 1) (Linear CFR), "cfr+" floors regrets
+    at zero and "vanilla" leaves them untouched.
+    
+    With settings.cfr_sampling == "external", each pass runs external-sampling
+    MCCFR for a traverser that alternates between OOP and IP; otherwise the
+    whole tree is traversed for both players.
+    
+    On CPU each batch is split across settings.cfr_num_threads of Numba's
+    threads, which accumulate into private deltas merged at the end of the
+    batch.
+    
+    Actions with cumulative regret below settings.cfr_prune_threshold pots are
+    pruned from the traversal except on every cfr_prune_interval-th pass.
+    
+    With use_gpu, the tables live on the GPU and batches are traversed in full
+    with CuPy array ops instead of the Numba kernels.
+    """
+    
+    def __init__(self, use_gpu: bool = False):
+        super().__init__(use_gpu)
+        self.combo_masks, self.num_combos = self._build_combo_masks()
+        self.node_by_history: Dict[int, int] = {}
+        
+        # Legal action types keyed by (facing_bet, can_raise)
+        self._action_templates = {
+            (True, True): (ActionType.FOLD, ActionType.CALL, ActionType.BET),
+            (True, False): (ActionType.FOLD, ActionType.CALL),
+            (False, True): (ActionType.CHECK, ActionType.BET),
+            (False, False): (ActionType.CHECK,)
+        }
+        
+    def get_info_set(self, hand: str, node: int) -> int:
+        """Get the integer information set id for a hand at a tree node."""
+        return node * len(self.hands) + self.hand_ids[hand]
+    
+    @staticmethod
+    def get_history_hash(history: List[Action]) -> int:
+        """Integer key of an action history, matching GameState.history_hash."""
+        history_hash = 0
+        for action in history:
+            history_hash = history_hash * HISTORY_HASH_BASE + action.action_id
+        return history_hash
     
     def get_available_actions(self, game_state: GameState) -> List[Action]:
         """Get available actions for current game state."""
-        actions = []
-        
         # Determine if there's a bet to face
         current_bet = max(game_state.oop_invested, game_state.ip_invested)
-        acting_invested = (game_state.oop_invested if game_state.to_act == Position.OOP 
+        acting_invested = (game_state.oop_invested if game_state.to_act is Position.OOP 
                           else game_state.ip_invested)
         
         bet_to_call = current_bet - acting_invested
-        
-        if bet_to_call > 0:
-            # Facing a bet - can fold or call
-            actions.append(Action(ActionType.FOLD))
-            actions.append(Action(ActionType.CALL, bet_to_call))
-            
-            # Can raise if under max bets
-            if game_state.bet_count < game_state.max_bets:
-                # Fixed bet size for simplicity
-                bet_size = game_state.pot * settings.default_bet_size
-                actions.append(Action(ActionType.BET, bet_size))
-        else:
-            # No bet to face - can check or bet
-            actions.append(Action(ActionType.CHECK))
-            
-            # Can bet if under max bets
-            if game_state.bet_count < game_state.max_bets:
-                bet_size = game_state.pot * settings.default_bet_size
-                actions.append(Action(ActionType.BET, bet_size))
-        
-        return actions
-    
-    def apply_action(self, game_state: GameState, action: Action) -> GameState:
-        """Apply action and return new game state."""
-        new_pot = game_state.pot
-        new_oop_invested = game_state.oop_invested
-        new_ip_invested = game_state.ip_invested
-        new_oop_stack = game_state.oop_stack
-        new_ip_stack = game_state.ip_stack
-        new_bet_count = game_state.bet_count
-        
-        # Apply action based on who's acting
-        if game_state.to_act == Position.OOP:
-            if action.type in [ActionType.CALL, ActionType.BET]:
-                new_oop_invested += action.size
-                new_oop_stack -= action.size
-                new_pot += action.size
-                if action.type == ActionType.BET:
-                    new_bet_count += 1
-            new_to_act = Position.IP
-        else:  # IP acting
-            if action.type in [ActionType.CALL, ActionType.BET]:
-                new_ip_invested += action.size
-                new_ip_stack -= action.size
-                new_pot += action.size
-                if action.type == ActionType.BET:
-                    new_bet_count += 1
-            new_to_act = Position.OOP
-        
-        return GameState(
-            pot=new_pot,
-            oop_invested=new_oop_invested,
-            ip_invested=new_ip_invested,
-            oop_stack=new_oop_stack,
-            ip_stack=new_ip_stack,
-            to_act=new_to_act,
-            history=game_state.history + [action],
-            street=game_state.street,
-            max_bets=game_state.max_bets,
-            bet_count=new_bet_count
-        )
+        can_raise = game_state.bet_count < game_state.max_bets
+        
+        # Fixed bet size for simplicity
+        sizes = {
+            ActionType.CALL: bet_to_call,
+            ActionType.BET: game_state.pot * settings.default_bet_size
+        }
+        template = self._action_templates[(bet_to_call > 0, can_raise)]
+        return [get_action(action_type, sizes.get(action_type, 0.0)) for action_type in template]
     
-    def get_payoff(self, game_state: GameState, oop_hand: str, ip_hand: str) -> Tuple[float, float]:
-        """Calculate payoffs at terminal node."""
-        if game_state.history and game_state.history[-1].type == ActionType.FOLD:
-            # Someone folded
-            if game_state.to_act == Position.IP:
-                # OOP folded (IP was about to act)
-                return (-game_state.oop_invested, game_state.pot - game_state.ip_invested)
-            else:
-                # IP folded (OOP was about to act)
-                return (game_state.pot - game_state.oop_invested, -game_state.ip_invested)
-        else:
-            # Showdown - compare hands
-            oop_equity = self.hand_evaluator.get_equity(oop_hand, ip_hand)
-            ip_equity = 1.0 - oop_equity
-            
-            oop_payoff = oop_equity * game_state.pot - game_state.oop_invested
-            ip_payoff = ip_equity * game_state.pot - game_state.ip_invested
-            
-            return (oop_payoff, ip_payoff)
-    
-    def cfr(self, game_state: GameState, oop_hand: str, ip_hand: str, 
-            oop_reach: float, ip_reach: float) -> Tuple[float, float]:
-        """Main CFR algorithm."""
-        
-        if game_state.is_terminal():
-            return self.get_payoff(game_state, oop_hand, ip_hand)
-        
-        # Get acting player and create info set
-        acting_player = Position(game_state.to_act)
-        hand = oop_hand if acting_player == Position.OOP else ip_hand
-        info_set = self.get_info_set(hand, game_state.history, acting_player)
-        
-        # Get available actions
-        actions = self.get_available_actions(game_state)
-        action_strs = [str(action) for action in actions]
-        
-        # Initialize node if not exists
-        if info_set not in self.nodes:
-            self.nodes[info_set] = CFRNode(info_set, action_strs)
-        
-        node = self.nodes[info_set]
-        
-        # Get current strategy
-        realization_weight = oop_reach if acting_player == Position.OOP else ip_reach
-        strategy = node.get_strategy(realization_weight)
-        
-        # Initialize utilities
-        action_utilities = {}
-        oop_utility = 0.0
-        ip_utility = 0.0
-        
-        # Recursively compute utilities for each action
-        for i, action in enumerate(actions):
-            action_str = action_strs[i]
-            new_game_state = self.apply_action(game_state, action)
-            
-            if acting_player == Position.OOP:
-                new_oop_reach = oop_reach * strategy[action_str]
-                new_ip_reach = ip_reach
-            else:
-                new_oop_reach = oop_reach
-                new_ip_reach = ip_reach * strategy[action_str]
-            
-            action_oop_utility, action_ip_utility = self.cfr(
-                new_game_state, oop_hand, ip_hand, new_oop_reach, new_ip_reach
-            )
-            
-            action_utilities[action_str] = (action_oop_utility, action_ip_utility)
-            
-            # Weight by strategy probability
-            oop_utility += strategy[action_str] * action_oop_utility
-            ip_utility += strategy[action_str] * action_ip_utility
-        
-        # Update regrets for acting player
-        for action_str in action_strs:
-            action_utility = action_utilities[action_str]
-            
-            if acting_player == Position.OOP:
-                regret = action_utility[0] - oop_utility
-                node.regret_sum[action_str] += ip_reach * regret  # Opponent reach
-            else:
-                regret = action_utility[1] - ip_utility
-                node.regret_sum[action_str] += oop_reach * regret  # Opponent reach
-        
-        return (oop_utility, ip_utility)
+    def _prepare_tree(self, pot: float, stack: float, max_bets: int) -> None:
+        """Build the public tree and regret tables unless they already match."""
+        tree_key = (pot, stack, max_bets)
+        if tree_key == self._tree_key:
+            return
+        
+        root = GameState(
+            pot=pot,
+            oop_invested=0.0,
+            ip_invested=0.0,
+            oop_stack=stack,
+            ip_stack=stack,
+            to_act=Position.OOP,  # OOP acts first
+            history=[],
+            street=Street.PREFLOP,
+            board=Board(),
+            max_bets=max_bets,
+            bet_count=0
+        )
+        self.tree = PublicTree.build(root, self.get_available_actions,
+                                     apply_action_inplace, undo_action_inplace)
+        # One bet size per action type, so the type sequence identifies the node
+        self.node_by_history = {int(h): node for node, h in enumerate(self.tree.history_hashes)}
+        num_info_sets = self.tree.num_nodes * len(self.hands)
+        self.regret_sum = self.xp.zeros((num_info_sets, self.tree.max_actions), dtype=np.float32)
+        self.strategy_sum = self.xp.zeros((num_info_sets, self.tree.max_actions), dtype=np.float32)
+        self._tree_key = tree_key
+        self.iteration = 0
+        self.prune_threshold = settings.cfr_prune_threshold * pot
     
     def train(self, oop_range: PokerRange, ip_range: PokerRange, 
               pot: float, stack: float, max_bets: int, iterations: int = None) -> None:
@@ -188,58 +119,82 @@ class CFRSolver:
             
         print(f"Training CFR solver for {iterations} iterations...")
         
-        # Get hands from ranges
-        oop_hands = list(oop_range.get_weighted_hands().keys())
-        ip_hands = list(ip_range.get_weighted_hands().keys())
-        
-        if not oop_hands or not ip_hands:
+        if not oop_range.get_hand_ids().size or not ip_range.get_hand_ids().size:
             raise ValueError("Both ranges must contain at least one hand")
         
-        for i in range(iterations):
-            # Sample hands from ranges
-            oop_hand = random.choice(oop_hands)
-            ip_hand = random.choice(ip_hands)
-            
-            # Skip if hands conflict (same cards)
-            if self._hands_conflict(oop_hand, ip_hand):
-                continue
-            
-            # Create initial game state
-            game_state = GameState(
-                pot=pot,
-                oop_invested=0.0,
-                ip_invested=0.0,
-                oop_stack=stack,
-                ip_stack=stack,
-                to_act=Position.OOP,  # OOP acts first
-                history=[],
-                street=0,
-                max_bets=max_bets,
-                bet_count=0
-            )
+        self._prepare_tree(pot, stack, max_bets)
+        
+        # Presample every iteration's hand pair by range weight, then a concrete
+        # combo of each, dropping pairs whose combos share a card
+        oop_samples = self._sample_hand_ids(oop_range, iterations)
+        ip_samples = self._sample_hand_ids(ip_range, iterations)
+        keep = (self._sample_combo_masks(oop_samples) & self._sample_combo_masks(ip_samples)) == 0
+        
+        # Showdown equity of every sampled OOP hand vs every sampled IP hand, in one pass
+        self._fill_equity_table(oop_samples[keep], ip_samples[keep])
+        
+        batch_size = settings.cfr_batch_size
+        for start in range(0, iterations, batch_size):
+            batch_keep = keep[start:start + batch_size]
+            oop_hand_ids = oop_samples[start:start + batch_size][batch_keep]
+            ip_hand_ids = ip_samples[start:start + batch_size][batch_keep]
             
-            # Run CFR
-            self.cfr(game_state, oop_hand, ip_hand, 1.0, 1.0)
+            if len(oop_hand_ids):
+                # Run CFR over the whole batch, alternating the sampling traverser
+                if settings.cfr_sampling == "external" and not self.use_gpu:
+                    traverser = Position.OOP if self.iteration % 2 == 0 else Position.IP
+                    self.cfr_external(oop_hand_ids, ip_hand_ids, traverser)
+                else:
+                    self.cfr(oop_hand_ids, ip_hand_ids)
+                self.iteration += 1
+                self._update_regrets(self.iteration)
             
-            if (i + 1) % 100 == 0:
-                print(f"Completed {i + 1} iterations")
+            print(f"Completed {min(start + batch_size, iterations)} iterations")
         
         self.iterations += iterations
         print(f"Training complete! Total iterations: {self.iterations}")
     
-    def _hands_conflict(self, hand1: str, hand2: str) -> bool:
-        """Check if two hands share cards (simplified)."""
-        # In a real implementation, you'd check actual card conflicts
-        # For now, just check if hands are identical
-        return hand1 == hand2
+    def _sample_hand_ids(self, poker_range: PokerRange, size: int) -> np.ndarray:
+        """Draw global hand ids in proportion to range weights."""
+        weights = poker_range.weights.astype(np.float64)
+        return self.rng.choice(len(weights), size=size, p=weights / weights.sum())
+    
+    def _build_combo_masks(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Card masks of every hand's combos, padded to 12 per hand, and combo counts."""
+        poker_range = PokerRange()
+        combo_masks = np.zeros((len(self.hands), 12), dtype=np.uint64)
+        num_combos = np.zeros(len(self.hands), dtype=np.int64)
+        for hand_id, hand in enumerate(self.hands):
+            combos = poker_range.get_combos(hand)
+            combo_masks[hand_id, :len(combos)] = [poker_range.card_mask(combo) for combo in combos]
+            num_combos[hand_id] = len(combos)
+        return combo_masks, num_combos
+    
+    def _sample_combo_masks(self, hand_ids: np.ndarray) -> np.ndarray:
+        """Card mask of a uniformly drawn combo of each hand."""
+        combo_idx = self.rng.integers(0, self.num_combos[hand_ids])
+        return self.combo_masks[hand_ids, combo_idx]
+    
+    def get_node_count(self) -> int:
+        """Number of information sets visited during training."""
+        if self.strategy_sum is None:
+            return 0
+        return int(self.xp.count_nonzero(self.strategy_sum.any(axis=1)))
     
     def get_strategy_for_hand(self, hand: str, history: List[Action], 
                              position: Position) -> Dict[str, float]:
         """Get average strategy for specific hand and history."""
-        info_set = self.get_info_set(hand, history, position)
-        
-        if info_set in self.nodes:
-            return self.nodes[info_set].get_average_strategy()
-        else:
-            # Return uniform strategy if not trained
-            return {"check": 0.5, "bet": 0.5} 
\ No newline at end of file
+        node = self.node_by_history.get(self.get_history_hash(history))
+        
+        if node is not None and hand in self.hand_ids:
+            acting = Position.OOP if self.tree.to_act[node] == 0 else Position.IP
+            n = self.tree.num_actions[node]
+            if n > 0 and acting == position:
+                strategy_sum = to_host(self.strategy_sum[self.get_info_set(hand, node), :n])
+                normalizing_sum = strategy_sum.sum()
+                if normalizing_sum > 0:
+                    return dict(zip(self.tree.action_labels[node],
+                                    (strategy_sum / normalizing_sum).tolist()))
+        
+        # Return uniform strategy if not trained
+        return {"check": 0.5, "bet": 0.5}
@@ -1,204 +1,194 @@
 """Comprehensive CFR solver with full postflop game tree support."""
-import random
 import time
+import numpy as np
 from typing import Dict, List, Tuple, Optional
 from models.enums import Position, ActionType, Street, BetSize
-from models.game_models import GameState, Action, Board, HandStrength, GameConfig
-from core.hand_evaluator import HandEvaluator
+from models.game_models import (GameState, Action, Board, HandStrength, GameConfig,
+                                FOLD, CHECK, get_action)
+from core.hand_evaluator import HAND_IDS
 from core.poker_range import PokerRange
-from .cfr_node import CFRNode
+from .game_tree import PublicTree, OOP, apply_action_inplace, undo_action_inplace
+from .tree_solver import TreeCFRSolver
+from .vectorized import to_host
 from config.settings import settings
 
 
-class ComprehensiveCFRSolver:
-    """Comprehensive CFR solver with full postflop game tree."""
+class ComprehensiveCFRSolver(TreeCFRSolver):
+    """Comprehensive CFR solver with full postflop game tree.
     
-    def __init__(self):
-        self.nodes = {}
-        self.hand_evaluator = HandEvaluator()
-        self.iterations = 0
+    The betting tree for a (pot, stack, max_bets, game config) spot is
+    flattened once into a PublicTree and traversed by the Numba CFR kernel.
+    Regrets and strategy sums live in dense float32 tables whose rows are
+    information sets, node * num_hands + hand.
+    
+    Each batch of hand pairs is split across settings.cfr_num_threads CPU
+    threads that accumulate into private regret deltas, merged into the
+    shared tables once the batch finishes.
+    
+    With use_gpu, the tables live on the GPU and batches are traversed in full
+    with CuPy array ops instead of the Numba kernels.
+    """
+    
+    def __init__(self, use_gpu: bool = False):
+        super().__init__(use_gpu)
         self.convergence_history = []
         self.last_strategy_change = 0.0
+        self._available_actions_cache: Dict[Tuple, Tuple[Action, ...]] = {}
+        
+        # Hand pairs that cannot be dealt together; only identical hands for now
+        self.hand_conflicts = np.eye(len(self.hands), dtype=bool)
+        
+        # Per-spot state next to the tree and tables
+        self._row_num_actions = None
+        self._last_average = None  # Average strategies at the previous convergence check
+        self._last_visited = None
         
     def get_info_set(self, hand: str, history: List[Action], position: Position, 
-                     board: Board) -> str:
-        """Create comprehensive information set string."""
-        history_str = ''.join([str(action) for action in history])
-        board_str = ''.join(board.cards) if board.cards else "preflop"
-        return f"{position.value}:{hand}:{board_str}:{history_str}"
+                     board: Board) -> Optional[int]:
+        """Table row of an information set, or None if it is not in the trained tree."""
+        if self.tree is None or hand not in self.hand_ids:
+            return None
+        if tuple(board.cards or ()) != self._board_cards:
+            return None
+        
+        node = self.tree.find_node(history)
+        if node is None or self.tree.num_actions[node] == 0:
+            return None
+        if (Position.OOP if self.tree.to_act[node] == OOP else Position.IP) != position:
+            return None
+        return node * len(self.hands) + self.hand_ids[hand]
     
-    def get_available_actions(self, game_state: GameState) -> List[Action]:
-        """Get available actions with user-configurable bet sizes."""
-        actions = []
+    @property
+    def num_nodes(self) -> int:
+        """Number of information sets visited during training."""
+        if self.strategy_sum is None:
+            return 0
+        return int(self.xp.count_nonzero(self.strategy_sum.any(axis=1)))
+    
+    def get_average_strategy(self, info_set: int) -> Dict[str, float]:
+        """Average strategy of an information set over all iterations."""
+        labels, avg_strategy = self._average_strategy_row(info_set)
+        return dict(zip(labels, avg_strategy.tolist()))
+    
+    def _average_strategy_row(self, info_set: int) -> Tuple[List[str], np.ndarray]:
+        """Action labels and average strategy probabilities of an information set."""
+        node = info_set // len(self.hands)
+        n = self.tree.num_actions[node]
+        strategy_sum = to_host(self.strategy_sum[info_set, :n]).astype(np.float64)
+        normalizing_sum = strategy_sum.sum()
+        
+        if normalizing_sum > 0:
+            avg_strategy = strategy_sum / normalizing_sum
+        else:
+            avg_strategy = np.full(n, 1.0 / n)
         
+        return self.tree.action_labels[node], avg_strategy
+    
+    def _average_strategies(self) -> np.ndarray:
+        """Average strategies of all information sets as a float32 table."""
+        xp = self.xp
+        totals = self.strategy_sum.sum(axis=1, keepdims=True)
+        unvisited = totals == 0
+        average = self.strategy_sum / xp.where(unvisited, np.float32(1.0), totals)
+        
+        # Unvisited rows play uniformly over their legal actions
+        num_actions = self._row_num_actions[:, None]
+        uniform = ((xp.arange(average.shape[1]) < num_actions) / xp.maximum(num_actions, 1)).astype(np.float32)
+        xp.copyto(average, uniform, where=unvisited)
+        return average
+    
+    def get_available_actions(self, game_state: GameState) -> Tuple[Action, ...]:
+        """Get available actions with user-configurable bet sizes.
+        
+        The result depends only on a few numeric state fields and the game
+        config, so it is memoized on those and shared between states.
+        """
         # Determine if there's a bet to face
         current_bet = max(game_state.oop_invested, game_state.ip_invested)
-        acting_invested = (game_state.oop_invested if game_state.to_act == Position.OOP 
+        acting_invested = (game_state.oop_invested if game_state.to_act is Position.OOP 
                           else game_state.ip_invested)
         
         bet_to_call = current_bet - acting_invested
         effective_stack = game_state.get_effective_stack()
+        game_config = game_state.game_config
+        
+        max_bets_for_street = game_config.get_max_bets_for_street(game_state.street)
+        key = (game_state.street, game_state.bet_count, game_state.pot, current_bet, bet_to_call,
+               effective_stack, tuple(game_config.bet_sizes), game_config.allow_all_in,
+               max_bets_for_street)
+        actions = self._available_actions_cache.get(key)
+        if actions is not None:
+            return actions
         
+        actions = []
         if bet_to_call > 0:
             # Facing a bet - can fold or call
-            actions.append(Action(ActionType.FOLD))
-            actions.append(Action(ActionType.CALL, bet_to_call))
+            actions.append(FOLD)
+            actions.append(get_action(ActionType.CALL, bet_to_call))
             
             # Can raise if under max bets for current street
-            max_bets_for_street = game_state.game_config.get_max_bets_for_street(game_state.street)
             if game_state.bet_count < max_bets_for_street:
                 # Get available bet sizes from game config
                 available_bet_sizes = game_state.get_available_bet_sizes()
                 
                 for bet_size in available_bet_sizes:
                     if bet_size > bet_to_call:  # Must be a raise
-                        actions.append(Action(ActionType.BET, bet_size))
+                        actions.append(get_action(ActionType.BET, bet_size))
         else:
             # No bet to face - can check or bet
-            actions.append(Action(ActionType.CHECK))
+            actions.append(CHECK)
             
             # Can bet if under max bets for current street
-            max_bets_for_street = game_state.game_config.get_max_bets_for_street(game_state.street)
             if game_state.bet_count < max_bets_for_street:
                 # Get available bet sizes from game config
                 available_bet_sizes = game_state.get_available_bet_sizes()
                 
                 for bet_size in available_bet_sizes:
-                    actions.append(Action(ActionType.BET, bet_size))
+                    actions.append(get_action(ActionType.BET, bet_size))
         
+        actions = self._available_actions_cache[key] = tuple(actions)
         return actions
     
-    def apply_action(self, game_state: GameState, action: Action) -> GameState:
-        """Apply action and return new game state."""
-        new_pot = game_state.pot
-        new_oop_invested = game_state.oop_invested
-        new_ip_invested = game_state.ip_invested
-        new_oop_stack = game_state.oop_stack
-        new_ip_stack = game_state.ip_stack
-        new_bet_count = game_state.bet_count
-        new_board = Board(cards=game_state.board.cards.copy())
-        new_game_config = game_state.game_config
-        
-        # Apply action based on who's acting
-        if game_state.to_act == Position.OOP:
-            if action.type in [ActionType.CALL, ActionType.BET]:
-                new_oop_invested += action.size
-                new_oop_stack -= action.size
-                new_pot += action.size
-                if action.type == ActionType.BET:
-                    new_bet_count += 1
-            new_to_act = Position.IP
-        else:  # IP acting
-            if action.type in [ActionType.CALL, ActionType.BET]:
-                new_ip_invested += action.size
-                new_ip_stack -= action.size
-                new_pot += action.size
-                if action.type == ActionType.BET:
-                    new_bet_count += 1
-            new_to_act = Position.OOP
-        
-        return GameState(
-            pot=new_pot,
-            oop_invested=new_oop_invested,
-            ip_invested=new_ip_invested,
-            oop_stack=new_oop_stack,
-            ip_stack=new_ip_stack,
-            to_act=new_to_act,
-            history=game_state.history + [action],
-            street=game_state.street,
-            board=new_board,
-            max_bets=game_state.max_bets,
-            bet_count=new_bet_count,
-            game_config=new_game_config
+    def _prepare_tree(self, pot: float, stack: float, max_bets: int,
+                      game_config: GameConfig, board: Board) -> None:
+        """Build the public tree and tables unless they already match the spot."""
+        tree_key = (pot, stack, max_bets, tuple(game_config.bet_sizes),
+                    tuple(sorted(game_config.max_bets_per_street.items())),
+                    game_config.allow_all_in, game_config.min_raise_size, tuple(board.cards))
+        if tree_key == self._tree_key:
+            return
+        
+        root = GameState(
+            pot=pot,
+            oop_invested=0.0,
+            ip_invested=0.0,
+            oop_stack=stack,
+            ip_stack=stack,
+            to_act=Position.OOP,
+            history=[],
+            street=Street.PREFLOP,
+            board=board,
+            max_bets=max_bets,
+            bet_count=0,
+            game_config=game_config
         )
-    
-    def get_payoff(self, game_state: GameState, oop_hand: str, ip_hand: str) -> Tuple[float, float]:
-        """Calculate payoffs at terminal node."""
-        if game_state.history and game_state.history[-1].type == ActionType.FOLD:
-            # Someone folded
-            if game_state.to_act == Position.IP:
-                # OOP folded (IP was about to act)
-                return (-game_state.oop_invested, game_state.pot - game_state.ip_invested)
-            else:
-                # IP folded (OOP was about to act)
-                return (game_state.pot - game_state.oop_invested, -game_state.ip_invested)
-        else:
-            # Showdown - compare hands with board
-            oop_equity = self.hand_evaluator.calculate_equity_monte_carlo(
-                oop_hand, ip_hand, game_state.board
-            )
-            ip_equity = 1.0 - oop_equity
-            
-            oop_payoff = oop_equity * game_state.pot - game_state.oop_invested
-            ip_payoff = ip_equity * game_state.pot - game_state.ip_invested
-            
-            return (oop_payoff, ip_payoff)
-    
-    def cfr(self, game_state: GameState, oop_hand: str, ip_hand: str, 
-            oop_reach: float, ip_reach: float) -> Tuple[float, float]:
-        """Main CFR algorithm with full game tree support."""
-        
-        if game_state.is_terminal():
-            return self.get_payoff(game_state, oop_hand, ip_hand)
-        
-        # Get acting player and create info set
-        acting_player = Position(game_state.to_act)
-        hand = oop_hand if acting_player == Position.OOP else ip_hand
-        info_set = self.get_info_set(hand, game_state.history, acting_player, game_state.board)
-        
-        # Get available actions
-        actions = self.get_available_actions(game_state)
-        action_strs = [str(action) for action in actions]
-        
-        # Initialize node if not exists
-        if info_set not in self.nodes:
-            self.nodes[info_set] = CFRNode(info_set, action_strs)
-        
-        node = self.nodes[info_set]
-        
-        # Get current strategy
-        realization_weight = oop_reach if acting_player == Position.OOP else ip_reach
-        strategy = node.get_strategy(realization_weight)
-        
-        # Initialize utilities
-        action_utilities = {}
-        oop_utility = 0.0
-        ip_utility = 0.0
-        
-        # Recursively compute utilities for each action
-        for i, action in enumerate(actions):
-            action_str = action_strs[i]
-            new_game_state = self.apply_action(game_state, action)
-            
-            if acting_player == Position.OOP:
-                new_oop_reach = oop_reach * strategy[action_str]
-                new_ip_reach = ip_reach
-            else:
-                new_oop_reach = oop_reach
-                new_ip_reach = ip_reach * strategy[action_str]
-            
-            action_oop_utility, action_ip_utility = self.cfr(
-                new_game_state, oop_hand, ip_hand, new_oop_reach, new_ip_reach
-            )
-            
-            action_utilities[action_str] = (action_oop_utility, action_ip_utility)
-            
-            # Weight by strategy probability
-            oop_utility += strategy[action_str] * action_oop_utility
-            ip_utility += strategy[action_str] * action_ip_utility
-        
-        # Update regrets for acting player
-        for action_str in action_strs:
-            action_utility = action_utilities[action_str]
-            
-            if acting_player == Position.OOP:
-                regret = action_utility[0] - oop_utility
-                node.regret_sum[action_str] += ip_reach * regret  # Opponent reach
-            else:
-                regret = action_utility[1] - ip_utility
-                node.regret_sum[action_str] += oop_reach * regret  # Opponent reach
-        
-        return (oop_utility, ip_utility)
+        self.tree = PublicTree.build(root, self.get_available_actions,
+                                     apply_action_inplace, undo_action_inplace)
+        
+        num_info_sets = self.tree.num_nodes * len(self.hands)
+        self.regret_sum = self.xp.zeros((num_info_sets, self.tree.max_actions), dtype=np.float32)
+        self.strategy_sum = self.xp.zeros((num_info_sets, self.tree.max_actions), dtype=np.float32)
+        self._row_num_actions = self.xp.asarray(np.repeat(self.tree.num_actions, len(self.hands)))
+        self._last_average = None
+        self._last_visited = None
+        self.iteration = 0
+        self.prune_threshold = settings.cfr_prune_threshold * pot
+        
+        if tuple(board.cards) != self._board_cards:
+            self.equity_table.fill(np.nan)
+            self._device_equity_table = None
+        self._board_cards = tuple(board.cards)
+        self._tree_key = tree_key
     
     def train(self, oop_range: PokerRange, ip_range: PokerRange, 
               pot: float, stack: float, max_bets: int, iterations: int = None,
@@ -215,71 +205,87 @@ class ComprehensiveCFRSolver:
         print(f"Max bets per street: {game_config.max_bets_per_street}")
         
         # Get hands from ranges
-        oop_hands = list(oop_range.get_weighted_hands().keys())
-        ip_hands = list(ip_range.get_weighted_hands().keys())
+        oop_hand_ids = oop_range.get_hand_ids()
+        ip_hand_ids = ip_range.get_hand_ids()
         
-        if not oop_hands or not ip_hands:
+        if not len(oop_hand_ids) or not len(ip_hand_ids):
             raise ValueError("Both ranges must contain at least one hand")
         
-        start_time = time.time()
-        last_convergence_check = 0
+        self._prepare_tree(pot, stack, max_bets, game_config, Board())
         
-        for i in range(iterations):
-            # Sample hands from ranges
-            oop_hand = random.choice(oop_hands)
-            ip_hand = random.choice(ip_hands)
-            
-            # Skip if hands conflict
-            if self._hands_conflict(oop_hand, ip_hand):
-                continue
-            
-            # Create initial game state with custom config
-            game_state = GameState(
-                pot=pot,
-                oop_invested=0.0,
-                ip_invested=0.0,
-                oop_stack=stack,
-                ip_stack=stack,
-                to_act=Position.OOP,
-                history=[],
-                street=Street.PREFLOP,
-                board=Board(),
-                max_bets=max_bets,
-                bet_count=0,
-                game_config=game_config
-            )
-            
-            # Run CFR
-            self.cfr(game_state, oop_hand, ip_hand, 1.0, 1.0)
+        # Presample every iteration's hand pair, skipping conflicts
+        oop_samples = oop_hand_ids[self.rng.integers(0, len(oop_hand_ids), size=iterations)]
+        ip_samples = ip_hand_ids[self.rng.integers(0, len(ip_hand_ids), size=iterations)]
+        keep = ~self.hand_conflicts[oop_samples, ip_samples]
+        
+        # Showdown equity of every sampled OOP hand vs every sampled IP hand, in one pass
+        self._fill_equity_table(oop_samples[keep], ip_samples[keep])
+        
+        start_time = time.perf_counter()
+        pairs_traversed = 0  # Hand pairs run through the tree, a machine-independent work count
+        
+        # This call's convergence points: every record_every-th check, so about
+        # convergence_history_size of them evenly spaced over the run
+        self.convergence_history = []
+        record_every = max(1, iterations // (convergence_check_interval * settings.convergence_history_size))
+        checks = 0
+        last_point = None
+        
+        batch_size = settings.cfr_batch_size
+        for start in range(0, iterations, batch_size):
+            end = min(start + batch_size, iterations)
+            batch_keep = keep[start:end]
+            if batch_keep.any():
+                batch_oop = oop_samples[start:end][batch_keep]
+                batch_ip = ip_samples[start:end][batch_keep]
+                
+                # Run CFR over the whole batch, alternating the sampling traverser
+                if settings.cfr_sampling == "external" and not self.use_gpu:
+                    traverser = Position.OOP if self.iteration % 2 == 0 else Position.IP
+                    self.cfr_external(batch_oop, batch_ip, traverser)
+                else:
+                    self.cfr(batch_oop, batch_ip)
+                pairs_traversed += len(batch_oop)
+                self.iteration += 1
+                self._update_regrets(self.iteration)
             
             # Check convergence periodically
-            if (i + 1) % convergence_check_interval == 0:
+            if end // convergence_check_interval > start // convergence_check_interval:
                 convergence_metric = self._check_convergence()
-                self.convergence_history.append({
-                    'iteration': i + 1,
+                last_point = {
+                    'iteration': end,
                     'convergence': convergence_metric,
-                    'nodes_count': len(self.nodes)
-                })
+                    'nodes_count': self.num_nodes
+                }
+                if checks % record_every == 0:
+                    self.convergence_history.append(last_point)
+                checks += 1
                 
                 if convergence_metric < settings.convergence_threshold:
-                    print(f"Converged at iteration {i + 1} with metric {convergence_metric:.6f}")
+                    print(f"Converged at iteration {end} with metric {convergence_metric:.6f}")
                     break
             
-            if (i + 1) % 10000 == 0:
-                elapsed = time.time() - start_time
-                print(f"Completed {i + 1} iterations in {elapsed:.2f}s")
+            if end // 10000 > start // 10000:
+                elapsed = time.perf_counter() - start_time
+                print(f"Completed {end} iterations in {elapsed:.2f}s")
+        
+        # The last check is always kept, as it is the final convergence
+        if last_point is not None and last_point not in self.convergence_history[-1:]:
+            self.convergence_history.append(last_point)
         
         self.iterations += iterations
-        training_time = time.time() - start_time
+        training_time = time.perf_counter() - start_time
         
         print(f"Training complete! Total iterations: {self.iterations}")
         print(f"Training time: {training_time:.2f}s")
-        print(f"Total nodes: {len(self.nodes)}")
+        print(f"Total nodes: {self.num_nodes}")
+        print(f"Hand pairs traversed: {pairs_traversed} ({pairs_traversed / max(training_time, 1e-9):.0f}/s)")
         
         return {
             'iterations': self.iterations,
             'training_time': training_time,
-            'nodes_count': len(self.nodes),
+            'nodes_count': self.num_nodes,
+            'pairs_traversed': pairs_traversed,
             'convergence_history': self.convergence_history,
             'bet_sizes_used': game_config.bet_sizes,
             'max_bets_per_street': game_config.max_bets_per_street
@@ -287,48 +293,55 @@ class ComprehensiveCFRSolver:
     
     def _check_convergence(self) -> float:
         """Check strategy convergence across all nodes."""
-        if not self.nodes:
+        xp = self.xp
+        visited = self.strategy_sum.any(axis=1)
+        if not visited.any():
             return float('inf')
         
-        total_change = 0.0
-        node_count = 0
-        
-        for node in self.nodes.values():
-            if hasattr(node, 'last_strategy'):
-                current_strategy = node.get_average_strategy()
-                change = sum(abs(current_strategy.get(action, 0) - node.last_strategy.get(action, 0))
-                           for action in current_strategy.keys())
-                total_change += change
-                node_count += 1
-                node.last_strategy = current_strategy.copy()
-            else:
-                node.last_strategy = node.get_average_strategy().copy()
+        # Mean L1 change of the average strategy of info sets seen at the last check
+        current = self._average_strategies()
+        previous, previous_visited = self._last_average, self._last_visited
+        self._last_average, self._last_visited = current, visited
+        if previous is None or not previous_visited.any():
+            return float('inf')
         
-        return total_change / node_count if node_count > 0 else float('inf')
-    
-    def _hands_conflict(self, hand1: str, hand2: str) -> bool:
-        """Check if two hands share cards."""
-        return hand1 == hand2
+        # Difference into the previous table's buffer, which is no longer needed
+        change = xp.abs(xp.subtract(current, previous, out=previous), out=previous).sum(axis=1)
+        return float(change[previous_visited].mean())
     
     def get_strategy_for_hand(self, hand: str, history: List[Action], 
                              position: Position, board: Board = None) -> Dict[str, float]:
         """Get average strategy for specific hand and history."""
+        return self._strategy_with_argmax(hand, history, position, board)[0]
+    
+    def _strategy_with_argmax(self, hand: str, history: List[Action], position: Position,
+                              board: Board = None) -> Tuple[Dict[str, float], str]:
+        """Average strategy for a hand and history, and its most likely action.
+        
+        The argmax is read off the strategy array before it becomes a dict.
+        """
         if board is None:
             board = Board()
             
         info_set = self.get_info_set(hand, history, position, board)
         
-        if info_set in self.nodes:
-            return self.nodes[info_set].get_average_strategy()
+        if info_set is not None:
+            labels, avg_strategy = self._average_strategy_row(info_set)
+            return dict(zip(labels, avg_strategy.tolist())), labels[int(avg_strategy.argmax())]
         else:
             # Return uniform strategy if not trained
-            return {"check": 0.5, "bet": 0.5}
+            return {"check": 0.5, "bet": 0.5}, "check"
     
     def get_comprehensive_strategy(self, hand: str, history: List[Action], 
                                   position: Position, board: Board = None,
                                   opponent_range: Dict[str, float] = None,
-                                  game_config: GameConfig = None) -> Dict:
-        """Get comprehensive strategy analysis with custom game config."""
+                                  game_config: GameConfig = None,
+                                  equity_vs_range: float = None) -> Dict:
+        """Get comprehensive strategy analysis with custom game config.
+        
+        equity_vs_range skips the per-hand range equity simulation when the
+        caller already has it.
+        """
         if board is None:
             board = Board()
         
@@ -336,18 +349,19 @@ class ComprehensiveCFRSolver:
             game_config = GameConfig()
         
         # Get basic strategy
-        strategy = self.get_strategy_for_hand(hand, history, position, board)
+        strategy, argmax_action = self._strategy_with_argmax(hand, history, position, board)
         
         # Get hand strength analysis
         if opponent_range:
             hand_strength = self.hand_evaluator.get_hand_strength_detailed(
-                hand, board, opponent_range
+                hand, board, opponent_range, equity_vs_range
             )
         else:
             hand_strength = None
         
         return {
             'strategy': strategy,
+            'argmax_action': argmax_action,
             'hand_strength': hand_strength,
             'board_texture': board.texture.value if board.texture else None,
             'pot_odds': self._calculate_pot_odds(history),
@@ -355,6 +369,49 @@ class ComprehensiveCFRSolver:
             'available_bet_sizes': game_config.bet_sizes
         }
     
+    def get_comprehensive_strategies_batch(self, hands: List[str], position: Position,
+                                           board: Board = None,
+                                           opponent_range: Dict[str, float] = None,
+                                           game_config: GameConfig = None,
+                                           equities: np.ndarray = None) -> Dict[str, Dict]:
+        """Comprehensive analysis of several hands at the root of a spot.
+        
+        The fields shared by every hand are computed once. equities, indexed
+        by hand id as returned by compute_range_equities, replaces the
+        per-hand range equity simulation.
+        """
+        if board is None:
+            board = Board()
+        
+        if game_config is None:
+            game_config = GameConfig()
+        
+        shared = {
+            'board_texture': board.texture.value if board.texture else None,
+            'pot_odds': self._calculate_pot_odds([]),
+            'position': position.value,
+            'available_bet_sizes': game_config.bet_sizes
+        }
+        hand_equities = [None] * len(hands) if equities is None else equities[
+            [HAND_IDS[hand] for hand in hands]].tolist()
+        
+        analyses = {}
+        for hand, equity_vs_range in zip(hands, hand_equities):
+            if opponent_range:
+                hand_strength = self.hand_evaluator.get_hand_strength_detailed(
+                    hand, board, opponent_range, equity_vs_range
+                )
+            else:
+                hand_strength = None
+            strategy, argmax_action = self._strategy_with_argmax(hand, [], position, board)
+            analyses[hand] = {
+                'strategy': strategy,
+                'argmax_action': argmax_action,
+                'hand_strength': hand_strength,
+                **shared
+            }
+        return analyses
+    
     def _calculate_pot_odds(self, history: List[Action]) -> float:
         """Calculate pot odds from action history."""
         if not history:
@@ -362,6 +419,6 @@ class ComprehensiveCFRSolver:
         
         # Simplified pot odds calculation
         last_action = history[-1]
-        if last_action.type == ActionType.BET:
+        if last_action.type is ActionType.BET:
             return last_action.size / 100.0  # Simplified
         return float('inf') 
\ No newline at end of file
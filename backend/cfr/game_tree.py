@@ -0,0 +1,157 @@
+"""Flattened public game tree for compiled CFR traversal."""
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import numpy as np
+from models.enums import Position
+from models.game_models import GameState, Action, HISTORY_HASH_BASE, FOLD_ID, CALL_ID, BET_ID
+
+# Acting-player codes stored in PublicTree.to_act
+OOP = 0
+IP = 1
+TERMINAL = -1
+
+# Folding-player codes stored in PublicTree.folded
+NO_FOLD = -1
+
+
+def apply_action_inplace(game_state: GameState, action: Action) -> Tuple:
+    """Apply action to game_state in place and return an undo token."""
+    undo_token = (game_state.pot, game_state.oop_invested, game_state.ip_invested,
+                  game_state.oop_stack, game_state.ip_stack, game_state.to_act,
+                  game_state.bet_count, game_state.history_hash)
+    
+    action_id = action.action_id
+    is_wager = action_id == CALL_ID or action_id == BET_ID
+    
+    # Apply action based on who's acting
+    if game_state.to_act is Position.OOP:
+        if is_wager:
+            game_state.oop_invested += action.size
+            game_state.oop_stack -= action.size
+        game_state.to_act = Position.IP
+    else:  # IP acting
+        if is_wager:
+            game_state.ip_invested += action.size
+            game_state.ip_stack -= action.size
+        game_state.to_act = Position.OOP
+    
+    if is_wager:
+        game_state.pot += action.size
+    if action_id == BET_ID:
+        game_state.bet_count += 1
+    
+    game_state.history.append(action)
+    game_state.history_hash = game_state.history_hash * HISTORY_HASH_BASE + action_id
+    return undo_token
+
+
+def undo_action_inplace(game_state: GameState, undo_token: Tuple) -> None:
+    """Restore game_state to before the action that produced undo_token."""
+    (game_state.pot, game_state.oop_invested, game_state.ip_invested,
+     game_state.oop_stack, game_state.ip_stack, game_state.to_act,
+     game_state.bet_count, game_state.history_hash) = undo_token
+    game_state.history.pop()
+
+
+class PublicTree:
+    """Public betting tree flattened into parallel NumPy arrays.
+    
+    Nodes are stored in depth-first order with the root at index 0. The
+    hole cards never change the betting tree, so one tree is shared by every
+    hand pair and an information set is simply (node, hand).
+    """
+    
+    def __init__(self):
+        self.to_act: np.ndarray = None         # int8, OOP / IP / TERMINAL
+        self.num_actions: np.ndarray = None    # int8
+        self.children: np.ndarray = None       # int32 (num_nodes, max_actions), -1 = none
+        self.pot: np.ndarray = None            # float32
+        self.oop_invested: np.ndarray = None   # float32
+        self.ip_invested: np.ndarray = None    # float32
+        self.folded: np.ndarray = None         # int8, OOP / IP / NO_FOLD
+        self.history_hashes: np.ndarray = None # int64, GameState.history_hash per node
+        self.child_by_key: List[Dict[str, int]] = []  # Per node, action key -> child node
+        self.actions: List[List[Action]] = []
+        self.action_labels: List[List[str]] = []
+        self.max_actions = 0
+    
+    @property
+    def num_nodes(self) -> int:
+        return len(self.actions)
+    
+    @classmethod
+    def build(cls, root: GameState,
+              get_available_actions: Callable[[GameState], List[Action]],
+              apply_action: Callable[[GameState, Action], Any],
+              undo_action: Callable[[GameState, Any], None]) -> "PublicTree":
+        """Enumerate every public state reachable from root.
+        
+        apply_action mutates the state in place and returns an undo token
+        that undo_action restores it from, so a single GameState is reused
+        for the whole walk.
+        """
+        to_act, pot, oop_invested, ip_invested, folded = [], [], [], [], []
+        history_hashes = []
+        actions, children, child_by_key = [], [], []
+        
+        def visit(game_state: GameState) -> int:
+            node = len(actions)
+            pot.append(game_state.pot)
+            oop_invested.append(game_state.oop_invested)
+            ip_invested.append(game_state.ip_invested)
+            history_hashes.append(game_state.history_hash)
+            children.append([])
+            child_by_key.append({})
+            
+            if game_state.is_terminal():
+                to_act.append(TERMINAL)
+                actions.append([])
+                if game_state.history and game_state.history[-1].action_id == FOLD_ID:
+                    # The player who just acted folded
+                    folded.append(OOP if game_state.to_act is Position.IP else IP)
+                else:
+                    folded.append(NO_FOLD)
+                return node
+            
+            to_act.append(OOP if game_state.to_act is Position.OOP else IP)
+            folded.append(NO_FOLD)
+            node_actions = list(get_available_actions(game_state))
+            actions.append(node_actions)
+            for action in node_actions:
+                undo_token = apply_action(game_state, action)
+                child = visit(game_state)
+                undo_action(game_state, undo_token)
+                children[node].append(child)
+                child_by_key[node][action.key] = child
+            return node
+        
+        visit(root)
+        
+        tree = cls()
+        tree.actions = actions
+        tree.action_labels = [[action.key for action in node_actions] for node_actions in actions]
+        tree.max_actions = max(len(node_actions) for node_actions in actions)
+        tree.to_act = np.array(to_act, dtype=np.int8)
+        tree.num_actions = np.array([len(node_actions) for node_actions in actions], dtype=np.int8)
+        tree.children = np.full((len(actions), max(tree.max_actions, 1)), -1, dtype=np.int32)
+        for node, node_children in enumerate(children):
+            tree.children[node, :len(node_children)] = node_children
+        tree.pot = np.array(pot, dtype=np.float32)
+        tree.oop_invested = np.array(oop_invested, dtype=np.float32)
+        tree.ip_invested = np.array(ip_invested, dtype=np.float32)
+        tree.folded = np.array(folded, dtype=np.int8)
+        tree.history_hashes = np.array(history_hashes, dtype=np.int64)
+        tree.child_by_key = child_by_key
+        return tree
+    
+    def find_node(self, history: List[Action]) -> Optional[int]:
+        """Node reached by an action history from the root; None if it leaves the tree.
+        
+        Follows one child edge per action, so the lookup is a dict hit per
+        step and stops at the first action that leaves the tree.
+        """
+        node = 0
+        for action in history:
+            node = self.child_by_key[node].get(action.key)
+            if node is None:
+                return None
+        return node
\ No newline at end of file
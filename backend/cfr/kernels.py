@@ -0,0 +1,365 @@
+"""Numba-compiled CFR kernels operating on a flattened PublicTree.
+
+Kernels release the GIL, so solves offloaded to worker threads do not
+stall the API event loop.
+"""
+import numpy as np
+from numba import njit, prange, get_num_threads
+
+
+@njit(cache=True, nogil=True)
+def _cfr_traverse_chunk(oop_hands, ip_hands, equity_table,
+                        to_act, num_actions, children, pot, oop_invested, ip_invested, folded,
+                        regret_sum, regret_out, strategy_out, num_hands, prune_threshold):
+    """Vanilla CFR over the public tree for a batch of hand pairs.
+    
+    Every hand pair shares the same public tree, so the batch is carried as
+    the innermost axis of the per-node reach, strategy and utility buffers;
+    only terminal payoffs and info set rows differ between pairs. All pairs
+    in a batch see the regrets from the start of the batch.
+    
+    Nodes are in depth-first order, so a forward pass over node ids sees
+    every parent before its children (reach probabilities) and a backward
+    pass sees every child before its parent (utilities and regrets). This
+    replaces recursion, which Numba cannot reload from its on-disk cache.
+    
+    Information set ids are node * num_hands + hand, so the tables are dense
+    (num_nodes * num_hands, max_actions) arrays. Strategies are read from
+    regret_sum; regret and strategy sum updates are added to regret_out and
+    strategy_out, which may be regret_sum itself since every read of a row
+    happens in the forward pass, before any write.
+    Showdown equity is read from equity_table[oop_hand, ip_hand]. The
+    per-node buffers use the dtype of regret_sum (float32 in the solvers),
+    halving the memory the passes stream through.
+    
+    Regret-based pruning (as in Libratus / Pluribus): an action whose
+    cumulative regret is below prune_threshold is not explored for that pair.
+    Its probability is zeroed, its subtree is skipped and its regret is left
+    unchanged. Pass -inf to disable pruning.
+    Returns (oop_utility, ip_utility) arrays at the root.
+    """
+    num_nodes = to_act.shape[0]
+    batch_size = oop_hands.shape[0]
+    oop_reach = np.empty((num_nodes, batch_size), dtype=regret_sum.dtype)
+    ip_reach = np.empty((num_nodes, batch_size), dtype=regret_sum.dtype)
+    strategy = np.zeros((num_nodes, children.shape[1], batch_size), dtype=regret_sum.dtype)
+    oop_util = np.empty((num_nodes, batch_size), dtype=regret_sum.dtype)
+    ip_util = np.empty((num_nodes, batch_size), dtype=regret_sum.dtype)
+    explored = np.zeros((num_nodes, children.shape[1], batch_size), dtype=np.bool_)
+    active = np.zeros((num_nodes, batch_size), dtype=np.bool_)
+    oop_reach[0, :] = 1.0
+    ip_reach[0, :] = 1.0
+    active[0, :] = True
+    
+    # Forward pass: regret matching and reach probabilities
+    for node in range(num_nodes):
+        player = to_act[node]
+        if player < 0:
+            continue
+        n = num_actions[node]
+        
+        for b in range(batch_size):
+            if not active[node, b]:
+                continue
+            info_set = node * num_hands + (oop_hands[b] if player == 0 else ip_hands[b])
+            
+            # One read of each regret for both the pruning mask and regret matching
+            num_explored = 0
+            normalizing_sum = 0.0
+            for a in range(n):
+                regret = regret_sum[info_set, a]
+                explored[node, a, b] = regret >= prune_threshold
+                if explored[node, a, b]:
+                    num_explored += 1
+                strategy[node, a, b] = regret if regret > 0.0 else 0.0
+                normalizing_sum += strategy[node, a, b]
+            if num_explored == 0:
+                for a in range(n):
+                    explored[node, a, b] = True
+                num_explored = n
+            
+            # Normalize and accumulate the strategy sum in the same loop
+            realization_weight = oop_reach[node, b] if player == 0 else ip_reach[node, b]
+            for a in range(n):
+                if normalizing_sum > 0.0:
+                    strategy[node, a, b] /= normalizing_sum
+                elif explored[node, a, b]:
+                    strategy[node, a, b] = 1.0 / num_explored
+                strategy_out[info_set, a] += realization_weight * strategy[node, a, b]
+        
+        for a in range(n):
+            child = children[node, a]
+            if player == 0:
+                oop_reach[child] = oop_reach[node] * strategy[node, a]
+                ip_reach[child] = ip_reach[node]
+            else:
+                oop_reach[child] = oop_reach[node]
+                ip_reach[child] = ip_reach[node] * strategy[node, a]
+            
+            # Partial pruning: below a node neither player reaches, every regret
+            # and strategy sum update is weighted by zero, so the pair skips it
+            for b in range(batch_size):
+                active[child, b] = explored[node, a, b] and (oop_reach[child, b] > 0.0
+                                                             or ip_reach[child, b] > 0.0)
+    
+    # Backward pass: utilities and regret updates
+    for node in range(num_nodes - 1, -1, -1):
+        player = to_act[node]
+        if player < 0:
+            if folded[node] == 0:
+                oop_util[node, :] = -oop_invested[node]
+                ip_util[node, :] = pot[node] - ip_invested[node]
+            elif folded[node] == 1:
+                oop_util[node, :] = pot[node] - oop_invested[node]
+                ip_util[node, :] = -ip_invested[node]
+            else:
+                for b in range(batch_size):
+                    oop_equity = equity_table[oop_hands[b], ip_hands[b]]
+                    oop_util[node, b] = oop_equity * pot[node] - oop_invested[node]
+                    ip_util[node, b] = (1.0 - oop_equity) * pot[node] - ip_invested[node]
+            continue
+        
+        n = num_actions[node]
+        for b in range(batch_size):
+            if not active[node, b]:
+                oop_util[node, b] = 0.0
+                ip_util[node, b] = 0.0
+                continue
+            
+            # Expected utility of each player under the strategy
+            node_oop_util = 0.0
+            node_ip_util = 0.0
+            for a in range(n):
+                if explored[node, a, b]:
+                    child = children[node, a]
+                    node_oop_util += strategy[node, a, b] * oop_util[child, b]
+                    node_ip_util += strategy[node, a, b] * ip_util[child, b]
+            oop_util[node, b] = node_oop_util
+            ip_util[node, b] = node_ip_util
+            
+            # Regret update weighted by opponent reach, skipping pruned actions
+            if player == 0:
+                info_set = node * num_hands + oop_hands[b]
+                for a in range(n):
+                    if explored[node, a, b]:
+                        child = children[node, a]
+                        regret_out[info_set, a] += ip_reach[node, b] * (oop_util[child, b] - node_oop_util)
+            else:
+                info_set = node * num_hands + ip_hands[b]
+                for a in range(n):
+                    if explored[node, a, b]:
+                        child = children[node, a]
+                        regret_out[info_set, a] += oop_reach[node, b] * (ip_util[child, b] - node_ip_util)
+    
+    return oop_util[0], ip_util[0]
+
+
+@njit(cache=True, nogil=True)
+def _cfr_traverse_external_chunk(oop_hands, ip_hands, equity_table,
+                                 to_act, num_actions, children, pot, oop_invested, ip_invested, folded,
+                                 regret_sum, regret_out, strategy_out, num_hands, traverser,
+                                 prune_threshold):
+    """External-sampling Monte Carlo CFR for a batch of hand pairs.
+    
+    Only the traverser's nodes branch over every action; at opponent nodes a
+    single action is sampled from the current strategy for each pair, so a
+    pair visits one opponent path instead of the whole tree. Regrets are
+    updated at traverser nodes without reach weighting (sampling accounts for
+    the opponent) and the opponent's strategy is added to strategy_sum at
+    every node it reaches. Callers alternate the traverser between passes.
+    
+    Uses the same flattened tree, pruning and table layout as
+    _cfr_traverse_chunk. Returns the traverser's utility at the root.
+    """
+    num_nodes = to_act.shape[0]
+    batch_size = oop_hands.shape[0]
+    max_actions = children.shape[1]
+    strategy = np.zeros((num_nodes, max_actions, batch_size), dtype=regret_sum.dtype)
+    explored = np.zeros((num_nodes, max_actions, batch_size), dtype=np.bool_)
+    active = np.zeros((num_nodes, batch_size), dtype=np.bool_)
+    util = np.zeros((num_nodes, batch_size), dtype=regret_sum.dtype)
+    active[0, :] = True
+    
+    # Forward pass: regret matching, opponent sampling and reachability
+    for node in range(num_nodes):
+        player = to_act[node]
+        if player < 0:
+            continue
+        n = num_actions[node]
+        
+        for b in range(batch_size):
+            if not active[node, b]:
+                continue
+            info_set = node * num_hands + (oop_hands[b] if player == 0 else ip_hands[b])
+            
+            num_explored = 0
+            normalizing_sum = 0.0
+            for a in range(n):
+                regret = regret_sum[info_set, a]
+                explored[node, a, b] = player != traverser or regret >= prune_threshold
+                if explored[node, a, b]:
+                    num_explored += 1
+                strategy[node, a, b] = regret if regret > 0.0 else 0.0
+                normalizing_sum += strategy[node, a, b]
+            if num_explored == 0:
+                for a in range(n):
+                    explored[node, a, b] = True
+                num_explored = n
+            
+            for a in range(n):
+                if normalizing_sum > 0.0:
+                    strategy[node, a, b] /= normalizing_sum
+                elif explored[node, a, b]:
+                    strategy[node, a, b] = 1.0 / num_explored
+            
+            if player == traverser:
+                for a in range(n):
+                    active[children[node, a], b] = explored[node, a, b]
+            else:
+                for a in range(n):
+                    strategy_out[info_set, a] += strategy[node, a, b]
+                
+                # Sample one opponent action from the current strategy
+                sample = np.random.random()
+                sampled = n - 1
+                cumulative = 0.0
+                for a in range(n):
+                    cumulative += strategy[node, a, b]
+                    if sample < cumulative:
+                        sampled = a
+                        break
+                for a in range(n):
+                    explored[node, a, b] = a == sampled
+                active[children[node, sampled], b] = True
+    
+    # Backward pass: traverser utilities and regret updates
+    for node in range(num_nodes - 1, -1, -1):
+        player = to_act[node]
+        for b in range(batch_size):
+            if not active[node, b]:
+                continue
+            if player < 0:
+                if folded[node] == 0:
+                    oop_value = -oop_invested[node]
+                    ip_value = pot[node] - ip_invested[node]
+                elif folded[node] == 1:
+                    oop_value = pot[node] - oop_invested[node]
+                    ip_value = -ip_invested[node]
+                else:
+                    oop_equity = equity_table[oop_hands[b], ip_hands[b]]
+                    oop_value = oop_equity * pot[node] - oop_invested[node]
+                    ip_value = (1.0 - oop_equity) * pot[node] - ip_invested[node]
+                util[node, b] = oop_value if traverser == 0 else ip_value
+                continue
+            
+            n = num_actions[node]
+            if player != traverser:
+                for a in range(n):
+                    if explored[node, a, b]:
+                        util[node, b] = util[children[node, a], b]
+                continue
+            
+            node_util = 0.0
+            for a in range(n):
+                if explored[node, a, b]:
+                    node_util += strategy[node, a, b] * util[children[node, a], b]
+            util[node, b] = node_util
+            
+            info_set = node * num_hands + (oop_hands[b] if player == 0 else ip_hands[b])
+            for a in range(n):
+                if explored[node, a, b]:
+                    regret_out[info_set, a] += util[children[node, a], b] - node_util
+    
+    return util[0]
+
+
+@njit(parallel=True, cache=True, nogil=True)
+def _merge_deltas(table, deltas):
+    """Add per-chunk deltas into a shared table, in parallel over rows."""
+    for row in prange(table.shape[0]):
+        for chunk in range(deltas.shape[0]):
+            for a in range(table.shape[1]):
+                table[row, a] += deltas[chunk, row, a]
+
+
+def batch_chunks(num_threads: int) -> int:
+    """Chunks to split a CFR batch into: num_threads capped at Numba's pool, 0 for all of it."""
+    if num_threads <= 0:
+        return get_num_threads()
+    return min(num_threads, get_num_threads())
+
+
+@njit(parallel=True, cache=True, nogil=True)
+def cfr_traverse(oop_hands, ip_hands, equity_table,
+                 to_act, num_actions, children, pot, oop_invested, ip_invested, folded,
+                 regret_sum, strategy_sum, num_hands, prune_threshold, num_chunks):
+    """Vanilla CFR for a batch of hand pairs, split across CPU threads.
+    
+    The batch is cut into num_chunks contiguous chunks traversed in parallel.
+    Each chunk accumulates into private regret and strategy deltas that are
+    merged into the shared tables once the whole batch is done, so there is
+    no contention on shared rows and the result matches a single-threaded
+    pass up to summation order. Returns (oop_utility, ip_utility) per pair.
+    """
+    batch_size = oop_hands.shape[0]
+    if num_chunks <= 1 or batch_size < 2:
+        return _cfr_traverse_chunk(oop_hands, ip_hands, equity_table,
+                                   to_act, num_actions, children, pot, oop_invested,
+                                   ip_invested, folded, regret_sum, regret_sum, strategy_sum,
+                                   num_hands, prune_threshold)
+    
+    num_chunks = min(num_chunks, batch_size)
+    regret_deltas = np.zeros((num_chunks,) + regret_sum.shape, dtype=regret_sum.dtype)
+    strategy_deltas = np.zeros((num_chunks,) + strategy_sum.shape, dtype=strategy_sum.dtype)
+    oop_util = np.empty(batch_size, dtype=regret_sum.dtype)
+    ip_util = np.empty(batch_size, dtype=regret_sum.dtype)
+    for chunk in prange(num_chunks):
+        start = chunk * batch_size // num_chunks
+        end = (chunk + 1) * batch_size // num_chunks
+        chunk_oop, chunk_ip = _cfr_traverse_chunk(
+            oop_hands[start:end], ip_hands[start:end], equity_table,
+            to_act, num_actions, children, pot, oop_invested, ip_invested, folded,
+            regret_sum, regret_deltas[chunk], strategy_deltas[chunk], num_hands, prune_threshold
+        )
+        oop_util[start:end] = chunk_oop
+        ip_util[start:end] = chunk_ip
+    
+    _merge_deltas(regret_sum, regret_deltas)
+    _merge_deltas(strategy_sum, strategy_deltas)
+    return oop_util, ip_util
+
+
+@njit(parallel=True, cache=True, nogil=True)
+def cfr_traverse_external(oop_hands, ip_hands, equity_table,
+                          to_act, num_actions, children, pot, oop_invested, ip_invested, folded,
+                          regret_sum, strategy_sum, num_hands, traverser, prune_threshold,
+                          num_chunks):
+    """External-sampling MCCFR for a batch of hand pairs, split across CPU threads.
+    
+    Chunked and merged like cfr_traverse. Returns the traverser's utility
+    per pair.
+    """
+    batch_size = oop_hands.shape[0]
+    if num_chunks <= 1 or batch_size < 2:
+        return _cfr_traverse_external_chunk(oop_hands, ip_hands, equity_table,
+                                            to_act, num_actions, children, pot, oop_invested,
+                                            ip_invested, folded, regret_sum, regret_sum,
+                                            strategy_sum, num_hands, traverser, prune_threshold)
+    
+    num_chunks = min(num_chunks, batch_size)
+    regret_deltas = np.zeros((num_chunks,) + regret_sum.shape, dtype=regret_sum.dtype)
+    strategy_deltas = np.zeros((num_chunks,) + strategy_sum.shape, dtype=strategy_sum.dtype)
+    util = np.empty(batch_size, dtype=regret_sum.dtype)
+    for chunk in prange(num_chunks):
+        start = chunk * batch_size // num_chunks
+        end = (chunk + 1) * batch_size // num_chunks
+        util[start:end] = _cfr_traverse_external_chunk(
+            oop_hands[start:end], ip_hands[start:end], equity_table,
+            to_act, num_actions, children, pot, oop_invested, ip_invested, folded,
+            regret_sum, regret_deltas[chunk], strategy_deltas[chunk], num_hands, traverser,
+            prune_threshold
+        )
+    
+    _merge_deltas(regret_sum, regret_deltas)
+    _merge_deltas(strategy_sum, strategy_deltas)
+    return util
\ No newline at end of file
@@ -0,0 +1,111 @@
+"""Shared state and kernel drivers of the solvers that run CFR on a PublicTree."""
+from typing import Tuple
+import numpy as np
+from models.enums import Position
+from models.game_models import Board
+from core.hand_evaluator import HandEvaluator, HAND_IDS
+from core.poker_range import ALL_HANDS
+from .kernels import cfr_traverse, cfr_traverse_external, batch_chunks
+from .vectorized import cfr_traverse_vectorized, get_array_module
+from config.settings import settings
+
+
+class TreeCFRSolver:
+    """Base of the CFR solvers that traverse a flattened PublicTree.
+    
+    Subclasses build self.tree and size regret_sum / strategy_sum to
+    tree.num_nodes * num_hands rows; the kernel wrappers here then run one
+    pass over it on the CPU kernels or, with use_gpu, the CuPy traversal,
+    and _update_regrets applies settings.cfr_variant after each pass.
+    """
+    
+    def __init__(self, use_gpu: bool = False):
+        self.use_gpu = use_gpu
+        self.xp = get_array_module(use_gpu)
+        self.hand_evaluator = HandEvaluator(use_gpu)
+        self.iterations = 0
+        self.iteration = 0  # CFR passes over the current tree, the DCFR clock
+        self.prune_threshold = -np.inf  # Regret below which actions are skipped
+        self.num_chunks = batch_chunks(settings.cfr_num_threads)  # Threads per batch, fixed per process
+        self.hands = ALL_HANDS
+        self.hand_ids = HAND_IDS  # Same ids as the hand strength table
+        self.rng = np.random.default_rng()
+        
+        # Tree and tables, rebuilt when the spot changes
+        self.tree = None
+        self._tree_key = None
+        self.regret_sum = None
+        self.strategy_sum = None
+        
+        # Showdown equity of row hand vs column hand on _board_cards; NaN until evaluated
+        self._board_cards: Tuple[str, ...] = ()
+        self.equity_table = np.full((len(self.hands), len(self.hands)), np.nan, dtype=np.float32)
+        self._device_equity_table = None
+    
+    def _pass_prune_threshold(self) -> float:
+        """Prune threshold of the current pass; every cfr_prune_interval-th pass is unpruned."""
+        if self.iteration % settings.cfr_prune_interval == 0:
+            return -np.inf
+        return self.prune_threshold
+    
+    def cfr(self, oop_hand_ids: np.ndarray, ip_hand_ids: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Run one CFR traversal of the public tree for a batch of hand pairs."""
+        tree = self.tree
+        prune_threshold = self._pass_prune_threshold()
+        if self.use_gpu:
+            if self._device_equity_table is None:
+                self._device_equity_table = self.xp.asarray(self.equity_table)
+            return cfr_traverse_vectorized(
+                self.xp, self.xp.asarray(oop_hand_ids), self.xp.asarray(ip_hand_ids),
+                self._device_equity_table, tree, self.regret_sum, self.strategy_sum,
+                len(self.hands), prune_threshold
+            )
+        return cfr_traverse(
+            oop_hand_ids, ip_hand_ids, self.equity_table,
+            tree.to_act, tree.num_actions, tree.children, tree.pot,
+            tree.oop_invested, tree.ip_invested, tree.folded,
+            self.regret_sum, self.strategy_sum, len(self.hands), prune_threshold,
+            self.num_chunks
+        )
+    
+    def cfr_external(self, oop_hand_ids: np.ndarray, ip_hand_ids: np.ndarray,
+                     traverser: Position) -> np.ndarray:
+        """Run one external-sampling MCCFR pass for a batch of hand pairs."""
+        tree = self.tree
+        return cfr_traverse_external(
+            oop_hand_ids, ip_hand_ids, self.equity_table,
+            tree.to_act, tree.num_actions, tree.children, tree.pot,
+            tree.oop_invested, tree.ip_invested, tree.folded,
+            self.regret_sum, self.strategy_sum, len(self.hands),
+            0 if traverser == Position.OOP else 1, self._pass_prune_threshold(),
+            self.num_chunks
+        )
+    
+    def _update_regrets(self, t: int) -> None:
+        """Apply the CFR+ / linear CFR / DCFR regret and strategy sum update after pass t."""
+        xp = self.xp
+        if settings.cfr_variant == "cfr+":
+            xp.maximum(self.regret_sum, 0.0, out=self.regret_sum)
+        elif settings.cfr_variant == "linear":
+            # Linear CFR: pass t weighted by t, i.e. DCFR with alpha = beta = gamma = 1
+            self.regret_sum *= t / (t + 1)
+            self.strategy_sum *= t / (t + 1)
+        elif settings.cfr_variant == "dcfr":
+            pos_factor = t ** settings.dcfr_alpha / (t ** settings.dcfr_alpha + 1)
+            neg_factor = t ** settings.dcfr_beta / (t ** settings.dcfr_beta + 1)
+            self.regret_sum *= xp.where(self.regret_sum > 0, pos_factor, neg_factor)
+            self.strategy_sum *= (t / (t + 1)) ** settings.dcfr_gamma
+    
+    def _fill_equity_table(self, oop_hand_ids: np.ndarray, ip_hand_ids: np.ndarray) -> None:
+        """Evaluate showdown equity of every OOP vs IP hand pair not yet in the table."""
+        oop_hand_ids = np.unique(oop_hand_ids)
+        ip_hand_ids = np.unique(ip_hand_ids)
+        if not np.isnan(self.equity_table[np.ix_(oop_hand_ids, ip_hand_ids)]).any():
+            return
+        
+        equity = self.hand_evaluator.get_equity_matrix(
+            oop_hand_ids, ip_hand_ids, Board(cards=list(self._board_cards))
+        )
+        self.equity_table[np.ix_(oop_hand_ids, ip_hand_ids)] = equity
+        self.equity_table[np.ix_(ip_hand_ids, oop_hand_ids)] = 1.0 - equity.T
+        self._device_equity_table = None
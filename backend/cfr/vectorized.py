@@ -0,0 +1,128 @@
+"""Array-module generic CFR traversal for running on GPU via CuPy."""
+from typing import Tuple
+import numpy as np
+from .game_tree import PublicTree, OOP
+
+
+def get_array_module(use_gpu: bool):
+    """Return cupy when use_gpu is set, numpy otherwise."""
+    if not use_gpu:
+        return np
+    try:
+        import cupy
+    except ImportError as e:
+        raise RuntimeError("use_gpu=True requires CuPy to be installed") from e
+    return cupy
+
+
+def to_host(array) -> np.ndarray:
+    """Copy an array from whichever device it lives on to a NumPy array."""
+    if isinstance(array, np.ndarray):
+        return array
+    return array.get()
+
+
+def _scatter_add(xp, table, rows, values) -> None:
+    """table[rows, :k] += values, accumulating repeated rows."""
+    index = (rows[:, None], xp.arange(values.shape[1])[None, :])
+    if xp is np:
+        np.add.at(table, index, values)
+    else:
+        import cupyx
+        cupyx.scatter_add(table, index, values)
+
+
+def cfr_traverse_vectorized(xp, oop_hands, ip_hands, equity_table, tree: PublicTree,
+                            regret_sum, strategy_sum, num_hands: int,
+                            prune_threshold: float = -np.inf) -> Tuple:
+    """Same CFR pass as kernels.cfr_traverse, written as batched array ops.
+    
+    Control flow walks the (small) public tree on the host while every
+    per-node quantity is a length-batch vector in xp, so with CuPy the
+    regret matching, reach products, showdown gathers and regret scatters
+    all run on the device and nothing is copied back until strategies are
+    read out. Pruned actions are masked out rather than skipped. Per-node
+    vectors keep the dtype of regret_sum, like the Numba kernel.
+    """
+    num_nodes = tree.num_nodes
+    batch_size = oop_hands.shape[0]
+    oop_reach = [None] * num_nodes
+    ip_reach = [None] * num_nodes
+    strategy = [None] * num_nodes
+    explored = [None] * num_nodes
+    active = [None] * num_nodes
+    oop_util = [None] * num_nodes
+    ip_util = [None] * num_nodes
+    oop_reach[0] = xp.ones(batch_size, dtype=regret_sum.dtype)
+    ip_reach[0] = xp.ones(batch_size, dtype=regret_sum.dtype)
+    active[0] = xp.ones(batch_size, dtype=bool)
+    
+    # Forward pass: regret matching and reach probabilities
+    for node in range(num_nodes):
+        player = tree.to_act[node]
+        if player < 0:
+            continue
+        n = int(tree.num_actions[node])
+        rows = node * num_hands + (oop_hands if player == OOP else ip_hands)
+        
+        regrets = regret_sum[rows, :n]
+        node_explored = regrets >= prune_threshold
+        node_explored |= ~node_explored.any(axis=1, keepdims=True)
+        explored[node] = node_explored & active[node][:, None]
+        
+        positive = xp.maximum(regrets, 0.0)
+        normalizing_sum = positive.sum(axis=1, keepdims=True)
+        node_strategy = xp.where(normalizing_sum > 0,
+                                 positive / xp.where(normalizing_sum > 0, normalizing_sum, 1.0),
+                                 (node_explored / node_explored.sum(axis=1, keepdims=True)).astype(regrets.dtype))
+        strategy[node] = node_strategy
+        
+        realization_weight = (oop_reach[node] if player == OOP else ip_reach[node]) * active[node]
+        _scatter_add(xp, strategy_sum, rows, realization_weight[:, None] * node_strategy)
+        
+        for a in range(n):
+            child = tree.children[node, a]
+            active[child] = explored[node][:, a]
+            if player == OOP:
+                oop_reach[child] = oop_reach[node] * node_strategy[:, a]
+                ip_reach[child] = ip_reach[node]
+            else:
+                oop_reach[child] = oop_reach[node]
+                ip_reach[child] = ip_reach[node] * node_strategy[:, a]
+    
+    showdown_equity = equity_table[oop_hands, ip_hands]
+    
+    # Backward pass: utilities and regret updates
+    for node in range(num_nodes - 1, -1, -1):
+        player = tree.to_act[node]
+        pot = tree.pot[node]
+        if player < 0:
+            if tree.folded[node] == 0:
+                oop_util[node] = xp.full(batch_size, -tree.oop_invested[node])
+                ip_util[node] = xp.full(batch_size, pot - tree.ip_invested[node])
+            elif tree.folded[node] == 1:
+                oop_util[node] = xp.full(batch_size, pot - tree.oop_invested[node])
+                ip_util[node] = xp.full(batch_size, -tree.ip_invested[node])
+            else:
+                oop_util[node] = showdown_equity * pot - tree.oop_invested[node]
+                ip_util[node] = (1.0 - showdown_equity) * pot - tree.ip_invested[node]
+            continue
+        
+        n = int(tree.num_actions[node])
+        child_ids = tree.children[node, :n]
+        child_oop = xp.stack([oop_util[child] for child in child_ids], axis=1)
+        child_ip = xp.stack([ip_util[child] for child in child_ids], axis=1)
+        weights = strategy[node] * explored[node]
+        oop_util[node] = (weights * child_oop).sum(axis=1)
+        ip_util[node] = (weights * child_ip).sum(axis=1)
+        
+        # Regret update weighted by opponent reach, skipping pruned actions
+        if player == OOP:
+            rows = node * num_hands + oop_hands
+            regrets = ip_reach[node][:, None] * (child_oop - oop_util[node][:, None])
+        else:
+            rows = node * num_hands + ip_hands
+            regrets = oop_reach[node][:, None] * (child_ip - ip_util[node][:, None])
+        _scatter_add(xp, regret_sum, rows, regrets * explored[node])
+    
+    return oop_util[0], ip_util[0]
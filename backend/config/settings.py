@@ -1,6 +1,6 @@
 """Application configuration settings."""
 from pydantic_settings import BaseSettings
-from typing import List
+from typing import Final, List
 
 
 class Settings(BaseSettings):
@@ -24,11 +24,20 @@ class Settings(BaseSettings):
     max_iterations: int = 1000000
     min_iterations: int = 10000
     convergence_threshold: float = 0.001  # Strategy convergence threshold
+    convergence_history_size: int = 1024  # About how many evenly spaced convergence points a train call keeps
+    cfr_variant: str = "dcfr"  # "vanilla", "cfr+", "linear" or "dcfr"
+    dcfr_alpha: float = 1.5  # Positive regret discount exponent
+    dcfr_beta: float = 0.0   # Negative regret discount exponent
+    dcfr_gamma: float = 2.0  # Strategy sum discount exponent
+    cfr_sampling: str = "external"  # "external" (ES-MCCFR) or "none" (full traversal)
+    cfr_prune_threshold: float = -10.0  # Prune actions below this regret (in pots)
+    cfr_prune_interval: int = 10  # Every Nth pass explores all actions
     
     # Game Settings
     default_pot_size: float = 100.0
     default_stack_size: float = 1000.0
     bet_sizes: List[float] = [0.33, 0.5, 0.75, 1.0, 1.5, 2.0]  # Multiple bet sizes
+    default_bet_size: float = 0.75  # Single bet size (fraction of pot) for the basic solver
     max_bets_per_street: int = 4
     max_streets: int = 4  # preflop, flop, turn, river
     
@@ -40,12 +49,16 @@ class Settings(BaseSettings):
     
     # Monte Carlo Settings
     mc_simulations: int = 10000  # For equity calculations
+    equity_cache_size: int = 100000  # Hand-vs-hand equities kept per HandEvaluator
+    range_equity_cache_size: int = 256  # Range-vs-range equity vectors kept per HandEvaluator
     board_samples: int = 1000    # For board texture analysis
     
     # Memory and Performance
     max_nodes_in_memory: int = 1000000
     save_strategies: bool = True
     strategy_cache_size: int = 10000
+    cfr_batch_size: int = 512  # Hand pairs traversed together per CFR pass
+    cfr_num_threads: int = 0  # CPU threads splitting each CFR batch; 0 uses all of Numba's
     
     class Config:
         env_file = ".env"
@@ -53,4 +66,9 @@ class Settings(BaseSettings):
 
 
 # Global settings instance
-settings = Settings() 
\ No newline at end of file
+settings = Settings()
+
+# Settings read on hot paths, fixed for the life of the process
+MC_SIMULATIONS: Final[int] = settings.mc_simulations
+EQUITY_CACHE_SIZE: Final[int] = settings.equity_cache_size
+RANGE_EQUITY_CACHE_SIZE: Final[int] = settings.range_equity_cache_size 
\ No newline at end of file
@@ -1,116 +1,558 @@
 """Comprehensive hand evaluation logic for GTO poker."""
-import random
 import itertools
-from typing import Dict, List, Tuple, Set
+import math
+from functools import lru_cache
+import numpy as np
+from numba import njit, prange
+from typing import Dict, List, Tuple
 from models.enums import BoardTexture
-from models.game_models import HandStrength, Board
-from config.settings import settings
+from models.game_models import HandStrength, Board, RANK_ORDER
+from core.poker_range import HAND_INDEX
+from config.settings import settings, MC_SIMULATIONS, EQUITY_CACHE_SIZE, RANGE_EQUITY_CACHE_SIZE
+
+
+def _build_rank_mask_tables() -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Lookup tables over 13-bit rank masks (bit v set = rank value v present, 2 = 0 ... A = 12).
+    
+    HIGHEST_RANK[mask] is the highest rank value in mask (-1 if empty).
+    TOP_RANKS[k, mask] packs the k highest rank values of mask as base-16 digits, highest first.
+    STRAIGHT_HIGH[mask] is the top rank value of the best straight in mask, or -1.
+    """
+    masks = np.arange(1 << 13)
+    
+    # Rank values of each mask, highest first, padded with -1
+    values = np.sort(np.where(masks[:, None] >> np.arange(13) & 1, np.arange(13), -1), axis=1)[:, ::-1]
+    highest = values[:, 0].astype(np.int32)
+    top_ranks = np.zeros((6, len(masks)), dtype=np.int32)
+    for k in range(1, 6):
+        top_ranks[k] = np.maximum(values[:, :k], 0) @ (16 ** np.arange(k - 1, -1, -1))
+    
+    # Straights are tested as 5-bit runs of the mask, lowest first so the best one is kept
+    straight_high = np.full(len(masks), -1, dtype=np.int32)
+    straight_high[masks & 0b1000000001111 == 0b1000000001111] = 3  # Wheel: A-2-3-4-5
+    for high in range(4, 13):
+        straight = 0b11111 << (high - 4)
+        straight_high[masks & straight == straight] = high
+    return highest, top_ranks, straight_high
+
+
+HIGHEST_RANK, TOP_RANKS, STRAIGHT_HIGH = _build_rank_mask_tables()
+RANK_BITS = 1 << np.arange(13)
+
+# Hand categories, stored above 20 bits of kickers in evaluated strengths
+HIGH_CARD, PAIR, TWO_PAIR, TRIPS, STRAIGHT, FLUSH, FULL_HOUSE, QUADS, STRAIGHT_FLUSH = range(9)
+
+SUITS = ['h', 'd', 'c', 's']
+
+# Cards as bits of a 52-bit mask, rank_index * 4 + suit_index as in PokerRange.card_mask
+CARDS = [f"{rank}{suit}" for rank in RANK_ORDER for suit in SUITS]
+CARD_BIT = {card: 1 << position for position, card in enumerate(CARDS)}
+FULL_DECK = (1 << len(CARDS)) - 1
+CARD_POSITIONS = np.arange(len(CARDS), dtype=np.int64)
+
+# Evaluator encoding of each bit position: rank value (2 = 0 ... A = 12) in bits 0-3, suit in bits 4-5
+CARD_CODES = np.array([(len(RANK_ORDER) - 1 - position // 4) | (position % 4) << 4
+                       for position in range(len(CARDS))], dtype=np.uint8)
+
+# Cactus Kev style keys: a prime per rank value (2 = 0 ... A = 12), multiplied over a hand's cards
+RANK_PRIMES = np.array([2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37, 41], dtype=np.int64)
+
+# Per-suit card counts packed as 4-bit fields; a field holds 5+ cards iff adding 3 sets its top bit
+FLUSH_COUNT_BIAS = 0x3333
+FLUSH_COUNT_TOP = 0x8888
+
+
+def _rank_strengths(rank_counts: np.ndarray) -> np.ndarray:
+    """Strength of the best hand in each row of per-rank card counts, ignoring flushes."""
+    rank_mask = (rank_counts > 0) @ RANK_BITS
+    pair_mask = (rank_counts >= 2) @ RANK_BITS
+    trips_mask = (rank_counts >= 3) @ RANK_BITS
+    quads_mask = (rank_counts == 4) @ RANK_BITS
+    
+    # Highest pair, trips and quads ranks, and the second pair
+    quads = HIGHEST_RANK[quads_mask]
+    trips = HIGHEST_RANK[trips_mask]
+    pair = HIGHEST_RANK[pair_mask]
+    second_pair = HIGHEST_RANK[pair_mask & ~(1 << np.maximum(pair, 0))]
+    full_house_pair = HIGHEST_RANK[pair_mask & ~(1 << np.maximum(trips, 0))]
+    straight = STRAIGHT_HIGH[rank_mask]
+    
+    def without(*values):
+        mask = rank_mask
+        for value in values:
+            mask = mask & ~(1 << np.maximum(value, 0))
+        return mask
+    
+    categories = [
+        (quads >= 0, QUADS, quads * 16 + TOP_RANKS[1, without(quads)]),
+        ((trips >= 0) & (full_house_pair >= 0), FULL_HOUSE, trips * 16 + full_house_pair),
+        (straight >= 0, STRAIGHT, straight),
+        (trips >= 0, TRIPS, trips * 256 + TOP_RANKS[2, without(trips)]),
+        (second_pair >= 0, TWO_PAIR, (pair * 16 + second_pair) * 16
+         + TOP_RANKS[1, without(pair, second_pair)]),
+        (pair >= 0, PAIR, pair * 4096 + TOP_RANKS[3, without(pair)]),
+    ]
+    return np.select(
+        [condition for condition, _, _ in categories],
+        [(category << 20) + kickers for _, category, kickers in categories],
+        default=(HIGH_CARD << 20) + TOP_RANKS[5, rank_mask]
+    )
+
+
+def _build_strength_tables() -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Lookup tables of hand strengths, as returned by HandEvaluator._evaluate_hands.
+    
+    UNSUITED_KEYS holds the sorted rank prime products of every multiset of
+    1 to 7 ranks, and UNSUITED_STRENGTH the strength of each without flushes.
+    FLUSH_STRENGTH[mask] is the strength of a flush over a 13-bit rank mask,
+    a straight flush when the mask holds a straight.
+    """
+    keys = []
+    strengths = []
+    for num_cards in range(1, 8):
+        num_multisets = math.comb(12 + num_cards, num_cards)
+        multisets = np.fromiter(
+            itertools.chain.from_iterable(itertools.combinations_with_replacement(range(13), num_cards)),
+            dtype=np.intp, count=num_multisets * num_cards
+        ).reshape(num_multisets, num_cards)
+        rank_counts = np.zeros((num_multisets, 13), dtype=np.int64)
+        for column in multisets.T:
+            rank_counts[np.arange(num_multisets), column] += 1
+        keys.append(RANK_PRIMES[multisets].prod(axis=1))
+        strengths.append(_rank_strengths(rank_counts))
+    keys = np.concatenate(keys)
+    order = np.argsort(keys)
+    
+    masks = np.arange(1 << 13)
+    flush_strength = np.where(STRAIGHT_HIGH[masks] >= 0,
+                              (STRAIGHT_FLUSH << 20) + STRAIGHT_HIGH[masks],
+                              (FLUSH << 20) + TOP_RANKS[5, masks]).astype(np.int64)
+    tables = keys[order], np.concatenate(strengths)[order].astype(np.int64), flush_strength
+    for table in tables:
+        table.flags.writeable = False
+    return tables
+
+
+UNSUITED_KEYS, UNSUITED_STRENGTH, FLUSH_STRENGTH = _build_strength_tables()
+
+
+@njit(cache=True, nogil=True)
+def _row_strength(cards, rank_primes, unsuited_keys, unsuited_strength, flush_strength):
+    """Strength of one row of up to 7 encoded cards, from the strength tables.
+    
+    Rank primes are multiplied and suit counts packed in one pass over the
+    cards; the flush suit's rank mask is only built when there is one.
+    """
+    product = 1
+    suit_counts = 0
+    for card in cards:
+        product *= rank_primes[card & 0x0F]
+        suit_counts += np.int64(1) << (4 * (card >> 4))  # 4-bit field per suit
+    strength = unsuited_strength[np.searchsorted(unsuited_keys, product)]
+    
+    flush_bits = (suit_counts + FLUSH_COUNT_BIAS) & FLUSH_COUNT_TOP
+    if flush_bits:
+        flush_suit = (flush_bits > 0xF) + (flush_bits > 0xFF) + (flush_bits > 0xFFF)
+        flush_mask = 0
+        for card in cards:
+            if card >> 4 == flush_suit:
+                flush_mask |= np.int64(1) << (card & 0x0F)
+        strength = max(strength, flush_strength[flush_mask])
+    return strength
+
+
+@njit(parallel=True, cache=True, nogil=True)
+def _row_strengths(cards, rank_primes, unsuited_keys, unsuited_strength, flush_strength):
+    """Strength of every row of a 2-d array of encoded cards, in parallel over rows."""
+    strengths = np.empty(cards.shape[0], dtype=np.int64)
+    for i in prange(cards.shape[0]):
+        strengths[i] = _row_strength(cards[i], rank_primes, unsuited_keys, unsuited_strength, flush_strength)
+    return strengths
+
+
+@njit(cache=True, nogil=True)
+def _row_parts(cards, rank_primes):
+    """Rank prime product, packed suit counts and per-suit rank masks of each row of encoded cards.
+    
+    Parts of disjoint card sets combine by multiplying products, adding
+    counts and ORing masks, so a fixed board is scanned once.
+    """
+    products = np.ones(cards.shape[0], dtype=np.int64)
+    suit_counts = np.zeros(cards.shape[0], dtype=np.int64)
+    suit_masks = np.zeros((cards.shape[0], 4), dtype=np.int64)
+    for i in range(cards.shape[0]):
+        for card in cards[i]:
+            products[i] *= rank_primes[card & 0x0F]
+            suit_counts[i] += np.int64(1) << (4 * (card >> 4))
+            suit_masks[i, card >> 4] |= np.int64(1) << (card & 0x0F)
+    return products, suit_counts, suit_masks
+
+
+@njit(parallel=True, cache=True, nogil=True)
+def _completion_strengths(hand_cards, boards, valid, rank_primes, unsuited_keys,
+                          unsuited_strength, flush_strength):
+    """Strength of each hand on each board where valid[hand, board], else 0; parallel over hands.
+    
+    Hands and boards are each scanned once by _row_parts; a (hand, board)
+    strength then only combines their parts and reads the tables.
+    """
+    hand_products, hand_suit_counts, hand_suit_masks = _row_parts(hand_cards, rank_primes)
+    board_products, board_suit_counts, board_suit_masks = _row_parts(boards, rank_primes)
+    ranks = np.zeros((hand_cards.shape[0], boards.shape[0]), dtype=np.int64)
+    for i in prange(hand_cards.shape[0]):
+        for b in range(boards.shape[0]):
+            if not valid[i, b]:
+                continue
+            strength = unsuited_strength[np.searchsorted(unsuited_keys, hand_products[i] * board_products[b])]
+            flush_bits = (hand_suit_counts[i] + board_suit_counts[b] + FLUSH_COUNT_BIAS) & FLUSH_COUNT_TOP
+            if flush_bits:
+                flush_suit = (flush_bits > 0xF) + (flush_bits > 0xFF) + (flush_bits > 0xFFF)
+                flush_mask = hand_suit_masks[i, flush_suit] | board_suit_masks[b, flush_suit]
+                strength = max(strength, flush_strength[flush_mask])
+            ranks[i, b] = strength
+    return ranks
+
+
+@njit(parallel=True, cache=True, nogil=True, error_model='numpy')
+def _pair_equities(ranks, valid, rows, cols):
+    """Equity of hand rows[i] vs hand cols[j] over the boards both can see; parallel over rows."""
+    equity = np.empty((rows.shape[0], cols.shape[0]), dtype=np.float32)
+    for i in prange(rows.shape[0]):
+        row = rows[i]
+        for j in range(cols.shape[0]):
+            col = cols[j]
+            wins = 0
+            ties = 0
+            count = 0
+            for b in range(ranks.shape[1]):
+                if valid[row, b] and valid[col, b]:
+                    count += 1
+                    if ranks[row, b] > ranks[col, b]:
+                        wins += 1
+                    elif ranks[row, b] == ranks[col, b]:
+                        ties += 1
+            equity[i, j] = (wins + 0.5 * ties) / count
+    return equity
+
+
+def _evaluate_rows(xp, cards, rank_primes, unsuited_keys, unsuited_strength, flush_strength):
+    """Strength of every row of encoded cards, as xp array ops.
+    
+    Same lookups as _row_strength, batched over rows so that with CuPy
+    the whole evaluation runs on the device; the tables must live there too.
+    """
+    ranks = (cards & 0x0F).astype(xp.int64)
+    suits = (cards >> 4).astype(xp.int64)
+    strengths = unsuited_strength[xp.searchsorted(unsuited_keys, rank_primes[ranks].prod(axis=-1))]
+    
+    # Flushes are rare, so suit masks are only built for rows that have one
+    flush_bits = ((1 << 4 * suits).sum(axis=-1) + FLUSH_COUNT_BIAS) & FLUSH_COUNT_TOP
+    flush_rows = xp.flatnonzero(flush_bits)
+    if flush_rows.size:
+        flush_bits = flush_bits[flush_rows]
+        flush_suit = (flush_bits > 0xF).astype(xp.int64) + (flush_bits > 0xFF) + (flush_bits > 0xFFF)
+        suit_bits = (suits[flush_rows] == flush_suit[:, None]) * (1 << ranks[flush_rows])
+        flush_mask = suit_bits[:, 0]
+        for column in range(1, suit_bits.shape[1]):
+            flush_mask = flush_mask | suit_bits[:, column]
+        strengths[flush_rows] = xp.maximum(flush_strength[flush_mask], strengths[flush_rows])
+    return strengths
+
+
+def _device_pair_equities(xp, hand_cards, boards, valid, rows, cols, tables):
+    """_completion_strengths then _pair_equities, as xp array ops.
+    
+    Only the (hand, board) rows a hand can see are evaluated, in one batch;
+    pairs are then reduced one row hand at a time over all column hands.
+    """
+    num_hands, num_boards = valid.shape
+    cards = xp.concatenate([xp.broadcast_to(hand_cards[:, None, :], (num_hands, num_boards, hand_cards.shape[1])),
+                            xp.broadcast_to(boards[None], (num_hands,) + boards.shape)], axis=2)
+    ranks = xp.zeros(valid.shape, dtype=xp.int64)
+    ranks[valid] = _evaluate_rows(xp, cards[valid], *tables)
+    
+    equity = xp.empty((len(rows), len(cols)), dtype=xp.float32)
+    for i, row in enumerate(rows.tolist()):
+        both_valid = valid[row] & valid[cols]
+        wins = (xp.count_nonzero((ranks[row] > ranks[cols]) & both_valid, axis=1)
+                + 0.5 * xp.count_nonzero((ranks[row] == ranks[cols]) & both_valid, axis=1))
+        equity[i] = wins / xp.count_nonzero(both_valid, axis=1)
+    return equity
+
+
+def _build_hand_strengths() -> Tuple[Dict[str, int], np.ndarray]:
+    """Build the preflop hand strength table, indexed like ALL_HANDS."""
+    hand_ids = HAND_INDEX
+    strengths = np.zeros(len(hand_ids), dtype=np.float64)  # float64 so API values stay exact (0.9, not 0.8999...)
+    
+    # Pocket pairs
+    for i, rank in enumerate(RANK_ORDER):
+        strengths[hand_ids[f"{rank}{rank}"]] = settings.hand_strength_base - (i * settings.hand_strength_decrement)
+    
+    # Suited and offsuit combinations
+    for i, rank1 in enumerate(RANK_ORDER):
+        for j, rank2 in enumerate(RANK_ORDER[i+1:], i+1):
+            # Base strength from high cards
+            base_strength = (len(RANK_ORDER) - i + len(RANK_ORDER) - j) / (2 * len(RANK_ORDER))
+            
+            # Suited gets bonus
+            strengths[hand_ids[f"{rank1}{rank2}s"]] = min(base_strength * settings.suited_bonus, 0.9)
+            strengths[hand_ids[f"{rank1}{rank2}o"]] = base_strength * settings.offsuit_penalty
+    
+    strengths.flags.writeable = False
+    return hand_ids, strengths
+
+
+# Built once at import; a pure function of settings
+HAND_IDS, HAND_STRENGTH = _build_hand_strengths()
+
+
+@lru_cache(maxsize=None)
+def _gpu_strength_tables() -> Tuple:
+    """CuPy and device copies of the strength tables, uploaded once per process."""
+    from cfr.vectorized import get_array_module
+    xp = get_array_module(True)
+    return xp, tuple(xp.asarray(table) for table in (RANK_PRIMES, UNSUITED_KEYS, UNSUITED_STRENGTH, FLUSH_STRENGTH))
+
+
+# Preflop nut potential classes: premium pairs, and suited hands led by these ranks
+_NUT_PAIRS = frozenset(['AA', 'KK', 'QQ'])
+_NUT_SUITED_RANKS = frozenset('AKQ')
 
 
 class HandEvaluator:
     """Comprehensive hand evaluator with Monte Carlo equity calculations."""
     
-    def __init__(self):
-        self.hand_strengths = self._build_hand_strengths()
-        self.rank_order = ['A', 'K', 'Q', 'J', 'T', '9', '8', '7', '6', '5', '4', '3', '2']
-        self.suits = ['h', 'd', 'c', 's']
-    
-    def _build_hand_strengths(self) -> Dict[str, float]:
-        """Build comprehensive hand strength lookup table."""
-        strengths = {}
-        
-        # Pocket pairs
-        for i, rank in enumerate(self.rank_order):
-            pair = f"{rank}{rank}"
-            strengths[pair] = settings.hand_strength_base - (i * settings.hand_strength_decrement)
-        
-        # Suited and offsuit combinations
-        for i, rank1 in enumerate(self.rank_order):
-            for j, rank2 in enumerate(self.rank_order[i+1:], i+1):
-                suited = f"{rank1}{rank2}s"
-                offsuit = f"{rank1}{rank2}o"
-                
-                # Base strength from high cards
-                base_strength = (len(self.rank_order) - i + len(self.rank_order) - j) / (2 * len(self.rank_order))
-                
-                # Suited gets bonus
-                strengths[suited] = min(base_strength * settings.suited_bonus, 0.9)
-                strengths[offsuit] = base_strength * settings.offsuit_penalty
-        
-        return strengths
+    def __init__(self, use_gpu: bool = False):
+        self.rank_order = RANK_ORDER
+        self.suits = SUITS
+        self.rng = np.random.default_rng()
+        
+        # With use_gpu, Monte Carlo equity matrices are evaluated with CuPy
+        # against device copies of the strength tables
+        self.use_gpu = use_gpu
+        self.xp = np
+        self._device_tables = (RANK_PRIMES, UNSUITED_KEYS, UNSUITED_STRENGTH, FLUSH_STRENGTH)
+        if use_gpu:
+            self.xp, self._device_tables = _gpu_strength_tables()
+        
+        # Equity of hand1 vs hand2 keyed by (hand1, hand2, board cards)
+        self._equity_cache: Dict[Tuple[str, str, Tuple[str, ...]], float] = {}
+        
+        # compute_range_equities results keyed by (oop weights, ip weights, sorted board cards)
+        self._range_equity_cache: Dict[Tuple[bytes, bytes, Tuple[str, ...]], Tuple[np.ndarray, np.ndarray]] = {}
     
     def get_hand_strength(self, hand: str) -> float:
         """Get normalized hand strength [0,1]."""
-        return self.hand_strengths.get(hand, 0.5)
+        hand_id = HAND_IDS.get(hand)
+        return float(HAND_STRENGTH[hand_id]) if hand_id is not None else 0.5
     
     def calculate_equity_monte_carlo(self, hand1: str, hand2: str, board: Board = None) -> float:
-        """Calculate equity using Monte Carlo simulation."""
+        """Calculate equity using Monte Carlo simulation.
+        
+        All board completions are drawn and evaluated at once as NumPy
+        arrays of encoded cards, one row per simulation. Equity is exact
+        when the remaining completions fit in MC_SIMULATIONS.
+        
+        Results are cached per (hand1, hand2, board), together with the
+        reverse matchup, so every showdown of the same pair on the same board
+        pays for the simulation once.
+        """
         if board is None:
             board = Board()
         
-        wins = 0
-        total_sims = settings.mc_simulations
+        cache_key = (hand1, hand2, tuple(board.cards))
+        equity = self._equity_cache.get(cache_key)
+        if equity is not None:
+            return equity
+        
+        total_sims = MC_SIMULATIONS
         
         # Extract cards from hands and board
-        hand1_cards = self._parse_hand(hand1)
-        hand2_cards = self._parse_hand(hand2)
-        board_cards = board.cards.copy()
+        hand1_mask = self._hand_mask(hand1)
+        hand2_mask = self._hand_mask(hand2)
+        board_mask = self._cards_mask(board.cards)
+        board_cards = self._encode_mask(board_mask)
         
         # Remove used cards from deck
-        used_cards = set(hand1_cards + hand2_cards + board_cards)
-        deck = self._create_deck(used_cards)
+        deck = self._create_deck(hand1_mask | hand2_mask | board_mask)
         
-        for _ in range(total_sims):
-            # Complete the board randomly
-            remaining_cards = deck.copy()
-            random.shuffle(remaining_cards)
-            
-            # Complete to 5 cards
-            while len(board_cards) < 5:
-                board_cards.append(remaining_cards.pop())
-            
-            # Evaluate hands
-            hand1_rank = self._evaluate_hand(hand1_cards + board_cards)
-            hand2_rank = self._evaluate_hand(hand2_cards + board_cards)
-            
-            if hand1_rank < hand2_rank:  # Lower rank = better hand
-                wins += 1
-            elif hand1_rank == hand2_rank:
-                wins += 0.5  # Split pot
+        # Enumerate every board completion when there are no more than the
+        # simulation budget (flop and later); otherwise complete the board with
+        # a random permutation prefix per simulation
+        needed = 5 - len(board_cards)
+        num_completions = math.comb(len(deck), needed)
+        if num_completions <= total_sims:
+            draws = np.array(list(itertools.combinations(range(len(deck)), needed)),
+                             dtype=np.int64).reshape(num_completions, needed)
+            total_sims = num_completions
+        else:
+            draws = self.rng.random((total_sims, len(deck))).argsort(axis=1)[:, :needed]
+        boards = np.concatenate([np.broadcast_to(board_cards, (total_sims, len(board_cards))),
+                                 deck[draws]], axis=1)
+        
+        # Evaluate hands
+        hand1_rank = self._evaluate_hands(np.concatenate(
+            [np.broadcast_to(self._encode_mask(hand1_mask), (total_sims, 2)), boards], axis=1))
+        hand2_rank = self._evaluate_hands(np.concatenate(
+            [np.broadcast_to(self._encode_mask(hand2_mask), (total_sims, 2)), boards], axis=1))
+        
+        # Higher rank = better hand, ties split the pot
+        wins = np.count_nonzero(hand1_rank > hand2_rank) + 0.5 * np.count_nonzero(hand1_rank == hand2_rank)
+        equity = float(wins / total_sims)
+        
+        if len(self._equity_cache) >= EQUITY_CACHE_SIZE:
+            self._equity_cache.clear()
+        self._equity_cache[(hand2, hand1, cache_key[2])] = 1.0 - equity
+        self._equity_cache[cache_key] = equity
+        return equity
+    
+    def get_equity_matrix(self, hand_ids1: np.ndarray, hand_ids2: np.ndarray,
+                          board: Board = None) -> np.ndarray:
+        """Equity of every hand id in hand_ids1 vs every hand id in hand_ids2 on a board.
+        
+        Hands are HAND_IDS ids, so hole cards and masks come straight from
+        the HAND_CARDS / HAND_MASKS tables with no string parsing.
+        One set of board completions is shared by all pairs, so each distinct
+        hand is evaluated once per completion instead of once per matchup.
+        A pair only counts completions that miss both hands' cards, which
+        leaves them uniform over the pair's own remaining deck. Enough
+        completions are drawn that a pair keeps about MC_SIMULATIONS of them,
+        or all of them are enumerated when that is no more. On a complete
+        board each pair has a single showdown, read off win / tie masks of
+        the hands' ranks. Returns a float32 (len(hand_ids1), len(hand_ids2))
+        array; equity[i, j] == 1 - equity of hand_ids2[j] vs hand_ids1[i].
+        With use_gpu, completions are still drawn on the host but evaluated
+        and reduced on the device.
+        """
+        if board is None:
+            board = Board()
+        
+        hand_ids1 = np.asarray(hand_ids1, dtype=np.int64)
+        hand_ids2 = np.asarray(hand_ids2, dtype=np.int64)
+        distinct, inverse = np.unique(np.concatenate([hand_ids1, hand_ids2]), return_inverse=True)
+        rows = inverse[:len(hand_ids1)]
+        cols = inverse[len(hand_ids1):]
+        
+        board_mask = self._cards_mask(board.cards)
+        board_cards = self._encode_mask(board_mask)
+        if len(board_cards) == 5:
+            ranks = self._evaluate_hands(np.concatenate(
+                [HAND_CARDS[distinct], np.broadcast_to(board_cards, (len(distinct), 5))], axis=1))
+            wins = ranks[rows][:, None] > ranks[cols][None, :]
+            ties = ranks[rows][:, None] == ranks[cols][None, :]
+            return (wins + 0.5 * ties).astype(np.float32)
+        
+        deck_positions = CARD_POSITIONS[(np.int64(FULL_DECK ^ board_mask) >> CARD_POSITIONS) & 1 == 1]
+        deck = CARD_CODES[deck_positions]
+        
+        # Completions needed for about MC_SIMULATIONS to miss four hole cards
+        needed = 5 - len(board.cards)
+        num_completions = math.comb(len(deck), needed)
+        total_sims = math.ceil(MC_SIMULATIONS * num_completions / math.comb(len(deck) - 4, needed))
+        if num_completions <= total_sims:
+            draws = np.array(list(itertools.combinations(range(len(deck)), needed)),
+                             dtype=np.int64).reshape(num_completions, needed)
+            total_sims = num_completions
+        else:
+            draws = self.rng.random((total_sims, len(deck))).argsort(axis=1)[:, :needed]
+        boards = np.concatenate([np.broadcast_to(board_cards, (total_sims, len(board_cards))),
+                                 deck[draws]], axis=1)
+        completion_masks = (np.int64(1) << deck_positions[draws]).sum(axis=1)
         
-        return wins / total_sims
+        # Which completions each distinct hand can see, and its strength on each of them
+        valid = (completion_masks[None, :] & HAND_MASKS[distinct][:, None]) == 0
+        if self.use_gpu:
+            from cfr.vectorized import to_host
+            xp = self.xp
+            equity = _device_pair_equities(xp, xp.asarray(HAND_CARDS[distinct]), xp.asarray(boards),
+                                           xp.asarray(valid), rows, xp.asarray(cols), self._device_tables)
+            return to_host(equity)
+        ranks = _completion_strengths(HAND_CARDS[distinct], np.ascontiguousarray(boards), valid, RANK_PRIMES,
+                                      UNSUITED_KEYS, UNSUITED_STRENGTH, FLUSH_STRENGTH)
+        return _pair_equities(ranks, valid, rows, cols)
     
     def calculate_equity_vs_range(self, hand: str, opponent_range: Dict[str, float], 
                                  board: Board = None) -> float:
-        """Calculate equity vs opponent range."""
+        """Calculate equity vs opponent range.
+        
+        Every opponent hand is scored in one get_equity_matrix call and the
+        equities are averaged by weight with a single dot product.
+        """
         if board is None:
             board = Board()
         
-        total_equity = 0.0
-        total_weight = 0.0
+        # Skip empty weights and conflicting hands
+        opponent_hands = [opponent_hand for opponent_hand, weight in opponent_range.items()
+                          if weight > 0 and not self._hands_conflict(hand, opponent_hand)]
+        if not opponent_hands:
+            return 0.5
         
-        for opponent_hand, weight in opponent_range.items():
-            if weight <= 0:
-                continue
-            
-            # Skip if hands conflict
-            if self._hands_conflict(hand, opponent_hand):
-                continue
+        weights = np.array([opponent_range[opponent_hand] for opponent_hand in opponent_hands], dtype=np.float32)
+        opponent_ids = [HAND_IDS[opponent_hand] for opponent_hand in opponent_hands]
+        equities = self.get_equity_matrix([HAND_IDS[hand]], opponent_ids, board)[0]
+        return float(np.dot(equities, weights) / weights.sum())
+    
+    def compute_range_equities(self, oop_weights: np.ndarray, ip_weights: np.ndarray,
+                               board: Board = None) -> Tuple[np.ndarray, np.ndarray]:
+        """Equity of every hand vs the opposing range, for both ranges at once.
+        
+        Takes dense weight vectors indexed by hand id (PokerRange.weights).
+        One equity matrix over the two ranges' hands is reduced with a
+        matrix-vector product per side, instead of a range equity call per
+        hand. Identical hands are skipped as in calculate_equity_vs_range.
+        Returns read-only (oop_equity, ip_equity) vectors; hands outside a
+        range get 0.5.
+        
+        Results are cached per pair of ranges and board, together with the
+        swapped pair, so repeated solves of a spot reuse them.
+        """
+        if board is None:
+            board = Board()
+        
+        board_key = tuple(sorted(board.cards))
+        cache_key = (oop_weights.tobytes(), ip_weights.tobytes(), board_key)
+        cached = self._range_equity_cache.get(cache_key)
+        if cached is not None:
+            return cached
+        
+        oop_ids = np.flatnonzero(oop_weights > 0)
+        ip_ids = np.flatnonzero(ip_weights > 0)
+        oop_equity = np.full(len(oop_weights), 0.5, dtype=np.float32)
+        ip_equity = np.full(len(ip_weights), 0.5, dtype=np.float32)
+        if len(oop_ids) and len(ip_ids):
+            equity = self.get_equity_matrix(oop_ids, ip_ids, board)
+            allowed = (oop_ids[:, None] != ip_ids[None, :]).astype(np.float32)
+            oop_w = oop_weights[oop_ids].astype(np.float32)
+            ip_w = ip_weights[ip_ids].astype(np.float32)
             
-            equity = self.calculate_equity_monte_carlo(hand, opponent_hand, board)
-            total_equity += equity * weight
-            total_weight += weight
+            oop_total = allowed @ ip_w
+            ip_total = allowed.T @ oop_w
+            oop_equity[oop_ids] = np.where(oop_total > 0, (equity * allowed) @ ip_w / np.where(oop_total > 0, oop_total, 1.0), 0.5)
+            ip_equity[ip_ids] = np.where(ip_total > 0, ((1.0 - equity) * allowed).T @ oop_w / np.where(ip_total > 0, ip_total, 1.0), 0.5)
+        oop_equity.flags.writeable = False
+        ip_equity.flags.writeable = False
         
-        return total_equity / total_weight if total_weight > 0 else 0.5
+        if len(self._range_equity_cache) >= RANGE_EQUITY_CACHE_SIZE:
+            self._range_equity_cache.clear()
+        self._range_equity_cache[(cache_key[1], cache_key[0], board_key)] = (ip_equity, oop_equity)
+        self._range_equity_cache[cache_key] = (oop_equity, ip_equity)
+        return oop_equity, ip_equity
     
     def get_hand_strength_detailed(self, hand: str, board: Board, 
-                                  opponent_range: Dict[str, float]) -> HandStrength:
-        """Get comprehensive hand strength analysis."""
+                                  opponent_range: Dict[str, float],
+                                  equity_vs_range: float = None) -> HandStrength:
+        """Get comprehensive hand strength analysis.
+        
+        equity_vs_range may be passed in when it was already computed for a
+        whole range with compute_range_equities.
+        """
         # Absolute strength
         absolute_strength = self.get_hand_strength(hand)
         
         # Equity vs opponent range
-        equity_vs_range = self.calculate_equity_vs_range(hand, opponent_range, board)
+        if equity_vs_range is None:
+            equity_vs_range = self.calculate_equity_vs_range(hand, opponent_range, board)
         
         # Relative strength (how strong vs opponent's range)
         relative_strength = equity_vs_range
@@ -146,42 +588,50 @@ class HandEvaluator:
                 return [f"{rank1}h", f"{rank2}d"]
         return []
     
-    def _create_deck(self, used_cards: Set[str]) -> List[str]:
-        """Create deck excluding used cards."""
-        deck = []
-        for rank in self.rank_order:
-            for suit in self.suits:
-                card = f"{rank}{suit}"
-                if card not in used_cards:
-                    deck.append(card)
-        return deck
+    def _hand_mask(self, hand: str) -> int:
+        """Card mask of the cards _parse_hand deals for a hand."""
+        hand_id = HAND_IDS.get(hand)
+        if hand_id is not None:
+            return int(HAND_MASKS[hand_id])
+        return self._cards_mask(self._parse_hand(hand))
+    
+    def _cards_mask(self, cards: List[str]) -> int:
+        """52-bit mask with one bit set per card."""
+        mask = 0
+        for card in cards:
+            mask |= CARD_BIT[card]
+        return mask
+    
+    def _create_deck(self, used_mask: int) -> np.ndarray:
+        """Encoded cards of the deck excluding the used cards."""
+        return self._encode_mask(FULL_DECK ^ used_mask)
+    
+    def _encode_mask(self, mask: int) -> np.ndarray:
+        """Encoded cards whose bits are set in mask, in bit order."""
+        return CARD_CODES[(np.int64(mask) >> CARD_POSITIONS) & 1 == 1]
+    
+    def _encode_cards(self, cards: List[str]) -> np.ndarray:
+        """Encode cards as uint8: rank value (2 = 0 ... A = 12) in bits 0-3, suit in bits 4-5."""
+        return CARD_CODES[[CARD_BIT[card].bit_length() - 1 for card in cards]]
+    
+    def _evaluate_hands(self, cards: np.ndarray) -> np.ndarray:
+        """Evaluate the best hand in each row of up to 7 encoded cards (higher = better).
+        
+        Returns strengths: the hand category shifted left 20 bits, plus the
+        ranks deciding ties within the category as base-16 digits.
+        As in the Cactus Kev evaluator, a row's rank multiset is keyed by the
+        product of its cards' rank primes and looked up in UNSUITED_STRENGTH;
+        only rows with five or more cards of one suit also read
+        FLUSH_STRENGTH, by the rank mask of that suit. Rows are evaluated
+        by the compiled _row_strengths kernel.
+        """
+        strengths = _row_strengths(np.ascontiguousarray(cards.reshape(-1, cards.shape[-1])), RANK_PRIMES,
+                                   UNSUITED_KEYS, UNSUITED_STRENGTH, FLUSH_STRENGTH)
+        return strengths.reshape(cards.shape[:-1])
     
     def _evaluate_hand(self, cards: List[str]) -> int:
-        """Evaluate hand strength (lower = better)."""
-        # Simplified hand evaluation - in production would use proper poker hand evaluator
-        ranks = [card[0] for card in cards]
-        suits = [card[1] for card in cards]
-        
-        # Count rank frequencies
-        rank_counts = {}
-        for rank in ranks:
-            rank_counts[rank] = rank_counts.get(rank, 0) + 1
-        
-        # Hand rankings (simplified)
-        if len(set(suits)) == 1 and len(cards) >= 5:  # Flush
-            return 5
-        elif 4 in rank_counts.values():  # Four of a kind
-            return 7
-        elif 3 in rank_counts.values() and 2 in rank_counts.values():  # Full house
-            return 6
-        elif 3 in rank_counts.values():  # Three of a kind
-            return 3
-        elif list(rank_counts.values()).count(2) == 2:  # Two pair
-            return 2
-        elif 2 in rank_counts.values():  # One pair
-            return 1
-        else:  # High card
-            return 0
+        """Evaluate hand strength (higher = better)."""
+        return int(self._evaluate_hands(self._encode_cards(cards)[None, :])[0])
     
     def _hands_conflict(self, hand1: str, hand2: str) -> bool:
         """Check if two hands share cards."""
@@ -192,9 +642,9 @@ class HandEvaluator:
         """Calculate nut potential of hand on given board."""
         # Simplified calculation
         if len(board.cards) == 0:  # Preflop
-            if hand in ['AA', 'KK', 'QQ']:
+            if hand in _NUT_PAIRS:
                 return 0.9
-            elif hand.endswith('s') and hand[0] in ['A', 'K', 'Q']:
+            elif hand.endswith('s') and hand[0] in _NUT_SUITED_RANKS:
                 return 0.7
             else:
                 return 0.5
@@ -209,7 +659,7 @@ class HandEvaluator:
         
         # Simplified board interaction
         hand_cards = self._parse_hand(hand)
-        board_ranks = [card[0] for card in board.cards]
+        board_ranks = {card[0] for card in board.cards}
         
         # Check for pairs, draws, etc.
         interaction_score = 0.5
@@ -220,9 +670,9 @@ class HandEvaluator:
                 interaction_score += 0.2
         
         # Flush draw potential
-        hand_suits = [card[1] for card in hand_cards]
-        board_suits = [card[1] for card in board.cards]
-        if len(set(hand_suits + board_suits)) <= 2:
+        suits = {card[1] for card in hand_cards}
+        suits.update(card[1] for card in board.cards)
+        if len(suits) <= 2:
             interaction_score += 0.1
         
         return min(interaction_score, 1.0)
@@ -230,18 +680,45 @@ class HandEvaluator:
     def _identify_blockers(self, hand: str, opponent_range: Dict[str, float]) -> List[str]:
         """Identify cards that block opponent's strong hands."""
         blockers = []
-        hand_cards = self._parse_hand(hand)
+        hand_mask = self._hand_mask(hand)
         
         # Check which strong hands are blocked
         strong_hands = ['AA', 'KK', 'QQ', 'JJ', 'AKs', 'AKo', 'AQs', 'AQo']
         
         for strong_hand in strong_hands:
-            strong_cards = self._parse_hand(strong_hand)
-            if any(card in hand_cards for card in strong_cards):
+            if self._hand_mask(strong_hand) & hand_mask:
                 blockers.append(strong_hand)
         
         return blockers
     
     def get_equity(self, hand1: str, hand2: str) -> float:
-        """Get equity of hand1 vs hand2 (legacy method)."""
-        return self.calculate_equity_monte_carlo(hand1, hand2) 
\ No newline at end of file
+        """Get preflop equity of hand1 vs hand2 (legacy method)."""
+        return float(preflop_equity_table()[HAND_IDS[hand1], HAND_IDS[hand2]])
+
+
+def _build_hand_cards() -> Tuple[np.ndarray, np.ndarray]:
+    """Encoded hole cards and card masks of every hand id, as dealt by _parse_hand."""
+    evaluator = HandEvaluator()
+    cards = [evaluator._parse_hand(hand) for hand in HAND_IDS]
+    hand_cards = np.array([evaluator._encode_cards(hand_cards) for hand_cards in cards], dtype=CARD_CODES.dtype)
+    hand_masks = np.array([evaluator._cards_mask(hand_cards) for hand_cards in cards], dtype=np.int64)
+    hand_cards.flags.writeable = False
+    hand_masks.flags.writeable = False
+    return hand_cards, hand_masks
+
+
+# Hole cards of each hand id, indexed like HAND_IDS
+HAND_CARDS, HAND_MASKS = _build_hand_cards()
+
+
+@lru_cache(maxsize=None)
+def preflop_equity_table() -> np.ndarray:
+    """Read-only 169x169 float32 preflop equity of row hand vs column hand.
+    
+    Built on first use rather than at import, since simulating every
+    matchup takes a few seconds; shared by every HandEvaluator after that.
+    """
+    hand_ids = np.arange(len(HAND_IDS))
+    equity = HandEvaluator().get_equity_matrix(hand_ids, hand_ids)
+    equity.flags.writeable = False
+    return equity 
\ No newline at end of file
@@ -1,34 +1,93 @@
 """Poker range handling and parsing."""
-from typing import List, Dict
+import re
+import sys
+from functools import lru_cache
+from typing import List, Dict, Tuple
+import numpy as np
+
+RANKS = 'AKQJT98765432'
+RANK_IDX = {rank: i for i, rank in enumerate(RANKS)}
+SUIT_IDX = {suit: i for i, suit in enumerate('hdcs')}
+
+# Suit pairs of the combos of a pocket pair, a suited and an offsuit hand, in get_combos order
+_PAIR_SUITS = tuple((s1, s2) for i, s1 in enumerate('hdcs') for s2 in 'hdcs'[i + 1:])
+_SUITED_SUITS = tuple((s, s) for s in 'hdcs')
+_OFFSUIT_SUITS = tuple((s1, s2) for s1 in 'hdcs' for s2 in 'hdcs' if s1 != s2)
+
+# Interned card strings, so combos of every hand share them
+_CARDS = {(rank, suit): sys.intern(rank + suit) for rank in RANKS for suit in 'hdcs'}
+
+# Range string tokens, classified by which named group matches
+_TOKEN_RE = re.compile(
+    r'(?P<weighted>[2-9TJQKA]{2}[so]?):(?P<weight>\d*\.?\d+)'
+    r'|(?P<pair_range>[2-9TJQKA]{2}-[2-9TJQKA]{2})'
+    r'|(?P<combo_range>[2-9TJQKA]{2}[so]-[2-9TJQKA]{2}[so])'
+    r'|(?P<plus>[2-9TJQKA]{2}[so]?\+)'
+    r'|(?P<single>[2-9TJQKA]{2}[so]?)'
+)
+
+
+def _generate_all_hands() -> Tuple[str, ...]:
+    """Generate all 169 possible hole card combinations.
+    
+    The strings are interned, so every range and hand-id table shares
+    the same objects and dict lookups on them match by identity.
+    """
+    ranks = RANKS
+    hands = []
+    
+    # Pocket pairs
+    for rank in ranks:
+        hands.append(sys.intern(f"{rank}{rank}"))
+    
+    # Suited and offsuit combinations
+    for i, rank1 in enumerate(ranks):
+        for j, rank2 in enumerate(ranks[i+1:], i+1):
+            hands.append(sys.intern(f"{rank1}{rank2}s"))
+            hands.append(sys.intern(f"{rank1}{rank2}o"))
+    
+    return tuple(hands)
+
+
+# The 169 hands in id order and their ids; built once and shared read-only by every PokerRange
+ALL_HANDS: Tuple[str, ...] = _generate_all_hands()
+HAND_INDEX: Dict[str, int] = {hand: i for i, hand in enumerate(ALL_HANDS)}
 
 
 class PokerRange:
-    """Complete poker range handling."""
+    """Complete poker range handling.
     
-    def __init__(self):
-        self.hands = self._generate_all_hands()
-        self.weights = {hand: 0.0 for hand in self.hands}
+    A range only owns its weights; hands and hand_ids are the shared
+    module-level ALL_HANDS and HAND_INDEX, so constructing one allocates
+    a single 169-entry array.
+    """
     
-    def _generate_all_hands(self) -> List[str]:
-        """Generate all 169 possible hole card combinations."""
-        ranks = ['A', 'K', 'Q', 'J', 'T', '9', '8', '7', '6', '5', '4', '3', '2']
-        hands = []
-        
-        # Pocket pairs
-        for rank in ranks:
-            hands.append(f"{rank}{rank}")
-        
-        # Suited and offsuit combinations
-        for i, rank1 in enumerate(ranks):
-            for j, rank2 in enumerate(ranks[i+1:], i+1):
-                hands.append(f"{rank1}{rank2}s")
-                hands.append(f"{rank1}{rank2}o")
-        
-        return hands
+    RANKS = ['A', 'K', 'Q', 'J', 'T', '9', '8', '7', '6', '5', '4', '3', '2']
+    SUITS = ['h', 'd', 'c', 's']
+    
+    def __init__(self):
+        self.hands = ALL_HANDS
+        self.hand_ids = HAND_INDEX
+        self.weights = np.zeros(len(self.hands), dtype=np.float32)  # Indexed by hand id
     
     def set_range_from_string(self, range_str: str) -> None:
         """Parse range string and set weights."""
-        self.weights = {hand: 0.0 for hand in self.hands}
+        self.weights = _parse_range_str(range_str).copy()
+    
+    @classmethod
+    def from_string(cls, range_str: str) -> 'PokerRange':
+        """Range of a range string, sharing the cached parse's read-only weights.
+        
+        Nothing is copied, so repeated requests for the same string cost a
+        cache hit; use set_range_from_string for weights that can be edited.
+        """
+        poker_range = cls()
+        poker_range.weights = _parse_range_str(range_str)
+        return poker_range
+    
+    def _parse_range_string(self, range_str: str) -> None:
+        """Set weights from a range string, from scratch."""
+        self.weights = np.zeros(len(self.hands), dtype=np.float32)
         
         if not range_str.strip():
             return
@@ -37,37 +96,37 @@ class PokerRange:
         parts = [part.strip() for part in range_str.split(',')]
         
         for part in parts:
-            if ':' in part:
+            match = _TOKEN_RE.fullmatch(part)
+            kind = match.lastgroup if match else None
+            if kind == 'weight':
                 # Handle weighted combos like "AA:0.5"
-                hand, weight = part.split(':')
-                weight = float(weight)
-                if hand in self.weights:
-                    self.weights[hand] = weight
-            elif '-' in part and not part.endswith('s') and not part.endswith('o'):
+                hand = match.group('weighted')
+                if hand in self.hand_ids:
+                    self.weights[self.hand_ids[hand]] = float(match.group('weight'))
+            elif kind == 'pair_range':
                 # Handle pair ranges like "AA-JJ"
                 self._add_pair_range(part)
-            elif '-' in part:
+            elif kind == 'combo_range':
                 # Handle other ranges like "AKs-ATs"
                 self._add_combo_range(part)
-            elif part.endswith('+'):
+            elif kind == 'plus':
                 # Handle plus notation like "AKo+"
                 self._add_plus_range(part)
-            else:
+            elif kind == 'single':
                 # Single hand or hand type
                 self._add_single_hand(part)
     
     def _add_pair_range(self, range_str: str) -> None:
         """Add pocket pair range like AA-JJ."""
         start, end = range_str.split('-')
-        ranks = ['A', 'K', 'Q', 'J', 'T', '9', '8', '7', '6', '5', '4', '3', '2']
         
-        start_idx = ranks.index(start[0])
-        end_idx = ranks.index(end[0])
+        start_idx = RANK_IDX[start[0]]
+        end_idx = RANK_IDX[end[0]]
         
         for i in range(start_idx, end_idx + 1):
-            pair = f"{ranks[i]}{ranks[i]}"
-            if pair in self.weights:
-                self.weights[pair] = 1.0
+            pair = f"{RANKS[i]}{RANKS[i]}"
+            if pair in self.hand_ids:
+                self.weights[self.hand_ids[pair]] = 1.0
     
     def _add_combo_range(self, range_str: str) -> None:
         """Add combination range like AKs-ATs."""
@@ -83,15 +142,14 @@ class PokerRange:
         
         # Get the first rank and find range of second ranks
         first_rank = start_hand[0]
-        ranks = ['A', 'K', 'Q', 'J', 'T', '9', '8', '7', '6', '5', '4', '3', '2']
         
-        start_second = ranks.index(start_hand[1])
-        end_second = ranks.index(end_hand[1])
+        start_second = RANK_IDX[start_hand[1]]
+        end_second = RANK_IDX[end_hand[1]]
         
         for i in range(start_second, end_second + 1):
-            hand = f"{first_rank}{ranks[i]}{suit_type}"
-            if hand in self.weights:
-                self.weights[hand] = 1.0
+            hand = f"{first_rank}{RANKS[i]}{suit_type}"
+            if hand in self.hand_ids:
+                self.weights[self.hand_ids[hand]] = 1.0
     
     def _add_plus_range(self, range_str: str) -> None:
         """Add plus range like AKo+."""
@@ -103,33 +161,72 @@ class PokerRange:
         second_rank = base_hand[1]
         suit_type = base_hand[2:] if len(base_hand) > 2 else 'o'
         
-        ranks = ['A', 'K', 'Q', 'J', 'T', '9', '8', '7', '6', '5', '4', '3', '2']
-        second_idx = ranks.index(second_rank)
+        second_idx = RANK_IDX[second_rank]
+        first_idx = RANK_IDX[first_rank]
         
         # Add all hands with same first rank and second rank or better
         for i in range(0, second_idx + 1):
-            if i != ranks.index(first_rank):  # Skip if same rank (would be pair)
-                hand = f"{first_rank}{ranks[i]}{suit_type}"
-                if hand in self.weights:
-                    self.weights[hand] = 1.0
+            if i != first_idx:  # Skip if same rank (would be pair)
+                hand = f"{first_rank}{RANKS[i]}{suit_type}"
+                if hand in self.hand_ids:
+                    self.weights[self.hand_ids[hand]] = 1.0
     
     def _add_single_hand(self, hand: str) -> None:
         """Add single hand to range."""
-        if hand in self.weights:
-            self.weights[hand] = 1.0
+        if hand in self.hand_ids:
+            self.weights[self.hand_ids[hand]] = 1.0
         elif len(hand) == 2:
             # Could be shorthand like AK (add both AKs and AKo)
             suited = f"{hand}s"
             offsuit = f"{hand}o"
-            if suited in self.weights:
-                self.weights[suited] = 1.0
-            if offsuit in self.weights:
-                self.weights[offsuit] = 1.0
+            if suited in self.hand_ids:
+                self.weights[self.hand_ids[suited]] = 1.0
+            if offsuit in self.hand_ids:
+                self.weights[self.hand_ids[offsuit]] = 1.0
+    
+    def get_combos(self, hand: str) -> List[Tuple[str, str]]:
+        """Expand a hand like "AKs" into its concrete card combos."""
+        return list(_hand_combos(hand))
+    
+    @classmethod
+    def card_mask(cls, cards) -> int:
+        """52-bit mask with one bit set per card."""
+        mask = 0
+        for card in cards:
+            mask |= 1 << (RANK_IDX[card[0]] * 4 + SUIT_IDX[card[1]])
+        return mask
+    
+    def get_hand_ids(self) -> np.ndarray:
+        """Ids of all hands with non-zero weights, indexing self.hands and self.weights."""
+        return np.flatnonzero(self.weights > 0)
     
     def get_weighted_hands(self) -> Dict[str, float]:
         """Get all hands with non-zero weights."""
-        return {hand: weight for hand, weight in self.weights.items() if weight > 0}
+        hand_ids = self.get_hand_ids()
+        return dict(zip([self.hands[i] for i in hand_ids], self.weights[hand_ids].tolist()))
     
     def get_total_combos(self) -> float:
         """Get total number of combinations in range."""
-        return sum(self.weights.values()) 
\ No newline at end of file
+        return float(self.weights.sum())
+
+
+@lru_cache(maxsize=1024)
+def _parse_range_str(range_str: str) -> np.ndarray:
+    """Read-only weights of a range string; parsing is pure, so repeats hit the cache."""
+    poker_range = PokerRange()
+    poker_range._parse_range_string(range_str)
+    poker_range.weights.flags.writeable = False
+    return poker_range.weights
+
+
+@lru_cache(maxsize=None)
+def _hand_combos(hand: str) -> Tuple[Tuple[str, str], ...]:
+    """Card combos of a hand, built from the suit pair tables and cached per hand."""
+    rank1, rank2 = hand[0], hand[1]
+    if rank1 == rank2:
+        suit_pairs = _PAIR_SUITS
+    elif hand.endswith('s'):
+        suit_pairs = _SUITED_SUITS
+    else:
+        suit_pairs = _OFFSUIT_SUITS
+    return tuple((_CARDS[rank1, s1], _CARDS[rank2, s2]) for s1, s2 in suit_pairs)
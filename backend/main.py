@@ -1,6 +1,7 @@
 """Main FastAPI application for the poker GTO solver."""
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from config.settings import settings
 from api.routes import router
 
@@ -10,7 +11,8 @@ def create_app() -> FastAPI:
     app = FastAPI(
         title=settings.app_name,
         version=settings.app_version,
-        debug=settings.debug
+        debug=settings.debug,
+        default_response_class=ORJSONResponse  # Faster serialization of large strategy payloads
     )
     
     # Add CORS middleware
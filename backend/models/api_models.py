@@ -1,4 +1,10 @@
-"""API request and response models."""
+"""API request and response models.
+
+Request and response bodies are Pydantic v2 models, validated by the Rust
+core. Records built only by the services (HandAnalysis, ConvergenceData)
+are slotted dataclasses, which skip validation on construction.
+"""
+from dataclasses import dataclass
 from pydantic import BaseModel, Field
 from typing import Dict, List, Optional
 from .enums import Street, BetSize
@@ -27,9 +33,11 @@ class SolverRequest(BaseModel):
     )
     allow_all_in: Optional[bool] = Field(True, description="Allow all-in as a bet option")
     min_raise_size: Optional[float] = Field(0.5, description="Minimum raise size as fraction of pot")
+    use_gpu: Optional[bool] = Field(False, description="Run CFR on the GPU (requires CuPy)")
 
 
-class HandAnalysis(BaseModel):
+@dataclass(slots=True)
+class HandAnalysis:
     """Detailed hand analysis."""
     strategy: Dict[str, float]
     absolute_strength: Optional[float] = None
@@ -42,7 +50,8 @@ class HandAnalysis(BaseModel):
     pot_odds: Optional[float] = None
 
 
-class ConvergenceData(BaseModel):
+@dataclass(slots=True)
+class ConvergenceData:
     """Convergence tracking data."""
     iteration: int
     convergence: float
@@ -1,24 +1,100 @@
 """Game-related data models."""
-from dataclasses import dataclass
-from typing import List, Optional, Dict
-from .enums import ActionType, Street, BetSize, BoardTexture
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import List, Optional, Dict, Tuple
+from .enums import ActionType, Position, Street, BetSize, BoardTexture
 
+# Non-zero per-type action codes, used as base-8 digits of GameState.history_hash
+ACTION_IDS: Dict[ActionType, int] = {action_type: i + 1 for i, action_type in enumerate(ActionType)}
+HISTORY_HASH_BASE = 8
+FOLD_ID = ACTION_IDS[ActionType.FOLD]
+CHECK_ID = ACTION_IDS[ActionType.CHECK]
+CALL_ID = ACTION_IDS[ActionType.CALL]
+BET_ID = ACTION_IDS[ActionType.BET]
+RAISE_ID = ACTION_IDS[ActionType.RAISE]
 
-@dataclass
+# Terminal (previous_id << 4) | last_id codes of the last two actions; previous_id
+# is 0 when only one action was made. Checking down only ends an unbet street.
+_TERMINAL_PAIRS = frozenset([(previous_id << 4) | FOLD_ID for previous_id in range(len(ACTION_IDS) + 1)]
+                            + [(BET_ID << 4) | CALL_ID])
+_UNBET_TERMINAL_PAIRS = _TERMINAL_PAIRS | {(CHECK_ID << 4) | CHECK_ID}
+
+
+@dataclass(frozen=True, slots=True)
 class Action:
-    """Represents a poker action."""
+    """Represents a poker action.
+    
+    Immutable, so instances can be shared between histories and trees and
+    used as dict keys; get_action returns pooled instances. action_id is
+    the integer code of the type, so hot paths compare ints, not strings.
+    """
     type: ActionType
     size: float = 0.0
     bet_size_type: Optional[BetSize] = None
+    key: str = field(init=False, repr=False, compare=False)
+    action_id: int = field(init=False, repr=False, compare=False)
+    
+    def __post_init__(self):
+        action_type = ActionType(self.type)
+        object.__setattr__(self, 'type', action_type)
+        object.__setattr__(self, 'action_id', ACTION_IDS[action_type])
+        # Precomputed string form, used in info set keys and action labels
+        if self.size > 0:
+            object.__setattr__(self, 'key', f"{action_type.value}_{self.size:.1f}")
+        else:
+            object.__setattr__(self, 'key', action_type.value)
     
     def __str__(self) -> str:
         """String representation of action."""
-        if self.size > 0:
-            return f"{self.type.value}_{self.size:.1f}"
-        return self.type.value
+        return self.key
+
+
+FOLD = Action(ActionType.FOLD)
+CHECK = Action(ActionType.CHECK)
+CALL = Action(ActionType.CALL)  # Unsized call, as parsed from request histories
+_FIXED_ACTIONS: Dict[Tuple[ActionType, float], Action] = {
+    (ActionType.FOLD, 0.0): FOLD,
+    (ActionType.CHECK, 0.0): CHECK,
+    (ActionType.CALL, 0.0): CALL
+}
+# Sized actions kept by get_action; sizes come from requests, so the pool is bounded
+SIZED_ACTION_POOL_SIZE = 4096
+
+
+# GameState.get_street_number values
+_STREET_NUMBERS: Dict[Street, int] = {
+    Street.PREFLOP: 0,
+    Street.FLOP: 1,
+    Street.TURN: 2,
+    Street.RIVER: 3
+}
+
+
+# Ranks from highest to lowest, and each rank's position in that order
+RANK_ORDER: List[str] = ['A', 'K', 'Q', 'J', 'T', '9', '8', '7', '6', '5', '4', '3', '2']
+RANK_INDEX: Dict[str, int] = {rank: i for i, rank in enumerate(RANK_ORDER)}
+
+# Board texture bitmasks: one bit per rank (A highest) and per suit
+_RANK_BITS: Dict[str, int] = {rank: 1 << (len(RANK_ORDER) - 1 - i) for rank, i in RANK_INDEX.items()}
+_SUIT_BITS: Dict[str, int] = {suit: 1 << i for i, suit in enumerate('hdcs')}
+_HIGH_RANKS_MASK = _RANK_BITS['A'] | _RANK_BITS['K'] | _RANK_BITS['Q'] | _RANK_BITS['J']
+
+
+def get_action(action_type: ActionType, size: float = 0.0) -> Action:
+    """Shared Action instance for a type and size."""
+    action = _FIXED_ACTIONS.get((action_type, size))
+    if action is None:
+        action = _sized_action(action_type, size)
+    return action
+
+
+@lru_cache(maxsize=SIZED_ACTION_POOL_SIZE)
+def _sized_action(action_type: ActionType, size: float) -> Action:
+    """Pooled sized action; evicted sizes are rebuilt as equal instances."""
+    return Action(action_type, size)
 
 
-@dataclass
+@dataclass(slots=True)
 class Board:
     """Represents the community board."""
     cards: List[str] = None  # e.g., ["Ah", "Ks", "Qd"]
@@ -34,53 +110,56 @@ class Board:
         self._update_texture()
     
     def _update_texture(self):
-        """Update board texture classification."""
+        """Update board texture classification.
+        
+        Ranks and suits are folded into bitmasks in one pass over the
+        cards, so every test below is a few integer operations.
+        """
         if len(self.cards) < 3:
             return
         
         # Basic texture analysis
-        ranks = [card[0] for card in self.cards]
-        suits = [card[1] for card in self.cards]
+        rank_mask = 0
+        suit_mask = 0
+        paired = False
+        for card in self.cards:
+            rank_bit = _RANK_BITS[card[0]]
+            paired = paired or bool(rank_mask & rank_bit)
+            rank_mask |= rank_bit
+            suit_mask |= _SUIT_BITS[card[1]]
         
-        if len(set(ranks)) < len(ranks):
+        if paired:
             self.texture = BoardTexture.PAIRED
-        elif len(set(suits)) == 1:
+        elif suit_mask & (suit_mask - 1) == 0:
             self.texture = BoardTexture.SUITED
-        elif self._is_connected(ranks):
+        elif self._is_connected(rank_mask):
             self.texture = BoardTexture.CONNECTED
-        elif self._has_high_cards(ranks):
+        elif self._has_high_cards(rank_mask):
             self.texture = BoardTexture.HIGH_CARDS
         else:
             self.texture = BoardTexture.DRY
     
-    def _is_connected(self, ranks: List[str]) -> bool:
-        """Check if board is connected."""
-        rank_order = ['A', 'K', 'Q', 'J', 'T', '9', '8', '7', '6', '5', '4', '3', '2']
-        rank_indices = [rank_order.index(r) for r in ranks]
-        rank_indices.sort()
-        
-        for i in range(len(rank_indices) - 1):
-            if rank_indices[i+1] - rank_indices[i] <= 2:
-                return True
-        return False
+    def _is_connected(self, rank_mask: int) -> bool:
+        """Check if board is connected: two ranks at most two apart."""
+        return bool(rank_mask & ((rank_mask >> 1) | (rank_mask >> 2)))
     
-    def _has_high_cards(self, ranks: List[str]) -> bool:
+    def _has_high_cards(self, rank_mask: int) -> bool:
         """Check if board has high cards."""
-        high_ranks = ['A', 'K', 'Q', 'J']
-        return any(r in high_ranks for r in ranks)
+        return bool(rank_mask & _HIGH_RANKS_MASK)
 
 
-@dataclass
+@dataclass(slots=True)
 class GameConfig:
     """Game configuration with user-defined parameters."""
-    bet_sizes: List[float] = None  # Custom bet sizes as fractions of pot
+    bet_sizes: Tuple[float, ...] = None  # Custom bet sizes as fractions of pot, stored as a tuple
     max_bets_per_street: Dict[str, int] = None  # Max bets per street
     allow_all_in: bool = True
     min_raise_size: float = 0.5  # Minimum raise as fraction of pot
     
     def __post_init__(self):
         if self.bet_sizes is None:
-            self.bet_sizes = [0.33, 0.5, 0.75, 1.0, 1.5, 2.0]
+            self.bet_sizes = (0.33, 0.5, 0.75, 1.0, 1.5, 2.0)
+        self.bet_sizes = tuple(self.bet_sizes)
         if self.max_bets_per_street is None:
             self.max_bets_per_street = {
                 "preflop": 4,
@@ -94,32 +173,44 @@ class GameConfig:
         return self.max_bets_per_street.get(street.value, 1)
     
     def get_available_bet_sizes(self, pot_size: float, effective_stack: float, 
-                               current_bet: float = 0) -> List[float]:
+                               current_bet: float = 0) -> Tuple[float, ...]:
         """Get available bet sizes for current situation."""
-        available_sizes = []
-        
-        for bet_ratio in self.bet_sizes:
-            bet_size = pot_size * bet_ratio
-            if bet_size <= effective_stack and bet_size > current_bet:
-                available_sizes.append(bet_size)
-        
-        # Add all-in if allowed and not already included
-        if self.allow_all_in and effective_stack > current_bet:
-            if effective_stack not in available_sizes:
-                available_sizes.append(effective_stack)
-        
-        return sorted(available_sizes)
+        return _available_bet_sizes(self.bet_sizes, self.allow_all_in,
+                                    pot_size, effective_stack, current_bet)
+
+
+@lru_cache(maxsize=8192)
+def _available_bet_sizes(bet_sizes: Tuple[float, ...], allow_all_in: bool, pot_size: float,
+                         effective_stack: float, current_bet: float) -> Tuple[float, ...]:
+    """Sorted legal bet sizes of a spot; pure, so repeated spots hit the cache."""
+    available_sizes = []
+    
+    for bet_ratio in bet_sizes:
+        bet_size = pot_size * bet_ratio
+        if bet_size <= effective_stack and bet_size > current_bet:
+            available_sizes.append(bet_size)
+    
+    # Add all-in if allowed and not already included
+    if allow_all_in and effective_stack > current_bet:
+        if effective_stack not in available_sizes:
+            available_sizes.append(effective_stack)
+    
+    return tuple(sorted(available_sizes))
 
 
-@dataclass
+@dataclass(slots=True)
 class GameState:
-    """Comprehensive game state for full postflop game tree."""
+    """Comprehensive game state for full postflop game tree.
+    
+    Slotted and mutable so solvers can apply/undo actions in place while
+    walking the tree instead of copying the state per edge.
+    """
     pot: float
     oop_invested: float
     ip_invested: float
     oop_stack: float
     ip_stack: float
-    to_act: str  # Position enum value
+    to_act: Position  # Coerced once, so solvers can compare by identity
     history: List[Action]
     street: Street
     board: Board
@@ -128,50 +219,41 @@ class GameState:
     last_bet_size: float = 0.0
     min_raise: float = 0.0
     game_config: GameConfig = None
+    history_hash: int = 0  # Base-8 Horner code of history action ids, kept by in-place solvers
+    max_bets_for_street: int = field(init=False, repr=False)  # Street and config are fixed per state
     
     def __post_init__(self):
+        self.to_act = Position(self.to_act)
         if self.board is None:
             self.board = Board()
         if self.game_config is None:
             self.game_config = GameConfig()
+        self.max_bets_for_street = self.game_config.get_max_bets_for_street(self.street)
     
     def is_terminal(self) -> bool:
-        """Check if game state is terminal."""
-        # Terminal if someone folded
-        if self.history and self.history[-1].type == ActionType.FOLD:
+        """Check if game state is terminal, cheapest checks first."""
+        # Terminal if all-in
+        if self.oop_stack <= 0 or self.ip_stack <= 0:
             return True
         
-        # Terminal if both players checked (and no bets this street)
-        if len(self.history) >= 2 and self.bet_count == 0:
-            if all(action.type == ActionType.CHECK for action in self.history[-2:]):
-                return True
-        
-        # Terminal if call after bet
-        if len(self.history) >= 2:
-            if (self.history[-2].type == ActionType.BET and 
-                self.history[-1].type == ActionType.CALL):
-                return True
-        
         # Terminal if max bets reached for current street
-        max_bets_for_street = self.game_config.get_max_bets_for_street(self.street)
-        if self.bet_count >= max_bets_for_street:
+        if self.bet_count >= self.max_bets_for_street:
             return True
         
-        # Terminal if all-in
-        if self.oop_stack <= 0 or self.ip_stack <= 0:
-            return True
-            
-        return False
+        # Terminal after a fold, a call of a bet, or two checks with no bet,
+        # read as one lookup of the last two action codes
+        history = self.history
+        if not history:
+            return False
+        pair_code = history[-1].action_id
+        if len(history) >= 2:
+            pair_code |= history[-2].action_id << 4
+        terminal_pairs = _UNBET_TERMINAL_PAIRS if self.bet_count == 0 else _TERMINAL_PAIRS
+        return pair_code in terminal_pairs
     
     def get_street_number(self) -> int:
         """Get street as number (0=preflop, 1=flop, 2=turn, 3=river)."""
-        street_map = {
-            Street.PREFLOP: 0,
-            Street.FLOP: 1,
-            Street.TURN: 2,
-            Street.RIVER: 3
-        }
-        return street_map.get(self.street, 0)
+        return _STREET_NUMBERS.get(self.street, 0)
     
     def get_effective_stack(self) -> float:
         """Get the smaller of the two stacks."""
@@ -180,7 +262,7 @@ class GameState:
     def get_pot_odds(self) -> float:
         """Calculate pot odds for the acting player."""
         current_bet = max(self.oop_invested, self.ip_invested)
-        acting_invested = (self.oop_invested if self.to_act == "oop" 
+        acting_invested = (self.oop_invested if self.to_act is Position.OOP 
                           else self.ip_invested)
         bet_to_call = current_bet - acting_invested
         
@@ -189,7 +271,7 @@ class GameState:
         
         return self.pot / bet_to_call
     
-    def get_available_bet_sizes(self) -> List[float]:
+    def get_available_bet_sizes(self) -> Tuple[float, ...]:
         """Get available bet sizes for current situation."""
         current_bet = max(self.oop_invested, self.ip_invested)
         effective_stack = self.get_effective_stack()
@@ -199,7 +281,7 @@ class GameState:
         )
 
 
-@dataclass
+@dataclass(slots=True)
 class HandStrength:
     """Detailed hand strength information."""
     absolute_strength: float  # 0-1 scale
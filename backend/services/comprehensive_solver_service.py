@@ -1,8 +1,11 @@
 """Comprehensive solver service for full GTO analysis."""
+import re
 import time
-from typing import Dict, List
-from models.enums import Position, Street
-from models.game_models import Action, Board, GameConfig
+import threading
+from functools import lru_cache
+from typing import Dict
+from models.enums import Position, Street, ActionType
+from models.game_models import Board, GameConfig, HandStrength, FOLD, CHECK, CALL, get_action
 from models.api_models import (
     SolverRequest, SolverResponse, HandAnalysis, ConvergenceData,
     PostflopRequest, PostflopResponse, GameConfigRequest, GameConfigResponse
@@ -10,23 +13,67 @@ from models.api_models import (
 from core.poker_range import PokerRange
 from cfr.comprehensive_cfr_solver import ComprehensiveCFRSolver
 
+# Parsed postflop action history strings: the constant actions, and bet_<size>
+_SIMPLE_ACTIONS = {"check": CHECK, "fold": FOLD, "call": CALL}
+_BET_RE = re.compile(r'bet_(\d*\.?\d+)')
+
+# Stands in for a missing hand strength, so every field reads as None
+_NO_HAND_STRENGTH = HandStrength(None, None, None, None, None, None)
+
+
+def _hand_analysis(analysis: Dict, equity_vs_range: float = None,
+                   pot_odds: float = None) -> HandAnalysis:
+    """HandAnalysis record of a solver analysis dict.
+    
+    equity_vs_range and pot_odds override the analysis' own values.
+    """
+    hand_strength = analysis['hand_strength'] or _NO_HAND_STRENGTH
+    return HandAnalysis(
+        strategy=analysis['strategy'],
+        absolute_strength=hand_strength.absolute_strength,
+        relative_strength=hand_strength.relative_strength,
+        equity_vs_range=hand_strength.equity_vs_range if equity_vs_range is None else equity_vs_range,
+        nut_potential=hand_strength.nut_potential,
+        board_interaction=hand_strength.board_interaction,
+        blockers=hand_strength.blockers,
+        board_texture=analysis['board_texture'],
+        pot_odds=analysis['pot_odds'] if pot_odds is None else pot_odds
+    )
+
+
+@lru_cache(maxsize=4)
+def _get_solver(use_gpu: bool) -> ComprehensiveCFRSolver:
+    """Warm ComprehensiveCFRSolver for a backend, reused across requests."""
+    return ComprehensiveCFRSolver(use_gpu=use_gpu)
+
+
+# One lock per cached solver, keyed like _get_solver and shared by every service instance
+_SOLVER_LOCKS: Dict[bool, threading.Lock] = {False: threading.Lock(), True: threading.Lock()}
+
 
 class ComprehensiveSolverService:
     """Service for comprehensive GTO solving with full postflop support."""
     
     def __init__(self):
-        self.solver = ComprehensiveCFRSolver()
+        self.solver = _get_solver(False)
     
     def solve_comprehensive_scenario(self, request: SolverRequest) -> SolverResponse:
-        """Solve comprehensive poker scenario with full game tree."""
+        """Solve comprehensive poker scenario with full game tree.
+        
+        request.use_gpu trains on the CuPy backend; requests sharing a
+        solver are serialized on that solver's lock.
+        """
+        use_gpu = bool(request.use_gpu)
+        with _SOLVER_LOCKS[use_gpu]:
+            return self._solve_comprehensive(_get_solver(use_gpu), request)
+    
+    def _solve_comprehensive(self, solver: ComprehensiveCFRSolver, request: SolverRequest) -> SolverResponse:
+        """Train the given solver on a scenario and collect strategies."""
         start_time = time.time()
         
         # Parse ranges
-        oop_range = PokerRange()
-        ip_range = PokerRange()
-        
-        oop_range.set_range_from_string(request.oop_range)
-        ip_range.set_range_from_string(request.ip_range)
+        oop_range = PokerRange.from_string(request.oop_range)
+        ip_range = PokerRange.from_string(request.ip_range)
         
         # Create board if cards provided
         board = Board()
@@ -43,7 +90,7 @@ class ComprehensiveSolverService:
         )
         
         # Train solver with convergence tracking and custom config
-        training_result = self.solver.train(
+        training_result = solver.train(
             oop_range=oop_range,
             ip_range=ip_range,
             pot=request.pot_size,
@@ -53,48 +100,27 @@ class ComprehensiveSolverService:
             game_config=game_config
         )
         
-        # Get comprehensive strategies for sample hands
-        oop_hands = list(oop_range.get_weighted_hands().keys())[:15]  # More hands
-        ip_hands = list(ip_range.get_weighted_hands().keys())[:15]
-        
-        oop_strategies = {}
-        ip_strategies = {}
-        
         # Get opponent ranges for analysis
         oop_range_dict = oop_range.get_weighted_hands()
         ip_range_dict = ip_range.get_weighted_hands()
         
-        for hand in oop_hands:
-            analysis = self.solver.get_comprehensive_strategy(
-                hand, [], Position.OOP, board, ip_range_dict, game_config
-            )
-            oop_strategies[hand] = HandAnalysis(
-                strategy=analysis['strategy'],
-                absolute_strength=analysis['hand_strength'].absolute_strength if analysis['hand_strength'] else None,
-                relative_strength=analysis['hand_strength'].relative_strength if analysis['hand_strength'] else None,
-                equity_vs_range=analysis['hand_strength'].equity_vs_range if analysis['hand_strength'] else None,
-                nut_potential=analysis['hand_strength'].nut_potential if analysis['hand_strength'] else None,
-                board_interaction=analysis['hand_strength'].board_interaction if analysis['hand_strength'] else None,
-                blockers=analysis['hand_strength'].blockers if analysis['hand_strength'] else None,
-                board_texture=analysis['board_texture'],
-                pot_odds=analysis['pot_odds']
-            )
+        # Get comprehensive strategies for sample hands
+        oop_hands = list(oop_range_dict)[:15]  # More hands
+        ip_hands = list(ip_range_dict)[:15]
         
-        for hand in ip_hands:
-            analysis = self.solver.get_comprehensive_strategy(
-                hand, [], Position.IP, board, oop_range_dict, game_config
-            )
-            ip_strategies[hand] = HandAnalysis(
-                strategy=analysis['strategy'],
-                absolute_strength=analysis['hand_strength'].absolute_strength if analysis['hand_strength'] else None,
-                relative_strength=analysis['hand_strength'].relative_strength if analysis['hand_strength'] else None,
-                equity_vs_range=analysis['hand_strength'].equity_vs_range if analysis['hand_strength'] else None,
-                nut_potential=analysis['hand_strength'].nut_potential if analysis['hand_strength'] else None,
-                board_interaction=analysis['hand_strength'].board_interaction if analysis['hand_strength'] else None,
-                blockers=analysis['hand_strength'].blockers if analysis['hand_strength'] else None,
-                board_texture=analysis['board_texture'],
-                pot_odds=analysis['pot_odds']
-            )
+        # Equity of every hand vs the opposing range in one pass
+        oop_equity, ip_equity = solver.hand_evaluator.compute_range_equities(
+            oop_range.weights, ip_range.weights, board
+        )
+        
+        oop_analyses = solver.get_comprehensive_strategies_batch(
+            oop_hands, Position.OOP, board, ip_range_dict, game_config, oop_equity
+        )
+        ip_analyses = solver.get_comprehensive_strategies_batch(
+            ip_hands, Position.IP, board, oop_range_dict, game_config, ip_equity
+        )
+        oop_strategies = {hand: _hand_analysis(analysis) for hand, analysis in oop_analyses.items()}
+        ip_strategies = {hand: _hand_analysis(analysis) for hand, analysis in ip_analyses.items()}
         
         computation_time = time.time() - start_time
         
@@ -123,11 +149,15 @@ class ComprehensiveSolverService:
     
     def analyze_postflop_spot(self, request: PostflopRequest) -> PostflopResponse:
         """Analyze specific postflop spot with user-configurable parameters."""
+        with _SOLVER_LOCKS[False]:
+            return self._analyze_postflop(request)
+    
+    def _analyze_postflop(self, request: PostflopRequest) -> PostflopResponse:
+        """Analyze a postflop spot against the shared solver."""
         start_time = time.time()
         
         # Parse opponent range
-        opponent_range = PokerRange()
-        opponent_range.set_range_from_string(request.opponent_range)
+        opponent_range = PokerRange.from_string(request.opponent_range)
         opponent_range_dict = opponent_range.get_weighted_hands()
         
         # Create board
@@ -135,19 +165,19 @@ class ComprehensiveSolverService:
         for card in request.board_cards:
             board.add_card(card)
         
-        # Parse action history
+        # Parse action history, tracking the size of the last bet
         history = []
+        last_bet_size = 0.0
         for action_str in request.action_history:
-            # Simplified action parsing
-            if action_str == "check":
-                history.append(Action("check"))
-            elif action_str == "fold":
-                history.append(Action("fold"))
-            elif action_str == "call":
-                history.append(Action("call"))
-            elif action_str.startswith("bet"):
-                size = float(action_str.split("_")[1])
-                history.append(Action("bet", size))
+            # Simplified action parsing; pooled actions carry their label already formatted
+            action = _SIMPLE_ACTIONS.get(action_str)
+            if action is None:
+                bet_match = _BET_RE.fullmatch(action_str)
+                if bet_match is None:
+                    raise ValueError(f"Unrecognized action in history: {action_str!r}")
+                last_bet_size = float(bet_match.group(1))
+                action = get_action(ActionType.BET, last_bet_size)
+            history.append(action)
         
         # Get position
         position = Position(request.position)
@@ -160,23 +190,24 @@ class ComprehensiveSolverService:
             min_raise_size=request.min_raise_size
         )
         
-        # Get comprehensive analysis
-        analysis = self.solver.get_comprehensive_strategy(
-            request.hand, history, position, board, opponent_range_dict, game_config
-        )
-        
-        # Calculate equity vs range
+        # Calculate equity vs range once; the analysis reuses it for the hand strength
         equity_vs_range = self.solver.hand_evaluator.calculate_equity_vs_range(
             request.hand, opponent_range_dict, board
         )
         
+        # Get comprehensive analysis
+        analysis = self.solver.get_comprehensive_strategy(
+            request.hand, history, position, board, opponent_range_dict, game_config,
+            equity_vs_range=equity_vs_range
+        )
+        
         # Determine recommended action
         strategy = analysis['strategy']
-        recommended_action = max(strategy.items(), key=lambda x: x[1])[0]
+        recommended_action = analysis['argmax_action']
         confidence = strategy[recommended_action]
         
         # Calculate pot odds
-        pot_odds = self._calculate_pot_odds_from_history(history, request.pot_size)
+        pot_odds = self._calculate_pot_odds_from_history(last_bet_size, request.pot_size)
         
         # Get available actions for this spot
         available_actions = list(strategy.keys())
@@ -186,17 +217,7 @@ class ComprehensiveSolverService:
         
         return PostflopResponse(
             strategy=strategy,
-            hand_strength=HandAnalysis(
-                strategy=strategy,
-                absolute_strength=analysis['hand_strength'].absolute_strength if analysis['hand_strength'] else None,
-                relative_strength=analysis['hand_strength'].relative_strength if analysis['hand_strength'] else None,
-                equity_vs_range=equity_vs_range,
-                nut_potential=analysis['hand_strength'].nut_potential if analysis['hand_strength'] else None,
-                board_interaction=analysis['hand_strength'].board_interaction if analysis['hand_strength'] else None,
-                blockers=analysis['hand_strength'].blockers if analysis['hand_strength'] else None,
-                board_texture=analysis['board_texture'],
-                pot_odds=pot_odds
-            ),
+            hand_strength=_hand_analysis(analysis, equity_vs_range, pot_odds),
             board_texture=board.texture.value if board.texture else "unknown",
             pot_odds=pot_odds,
             position=request.position,
@@ -241,7 +262,8 @@ class ComprehensiveSolverService:
         """Estimate number of nodes in game tree."""
         # Simplified estimation based on bet sizes and max bets
         avg_bet_sizes = len(request.bet_sizes)
-        avg_max_bets = sum(request.max_bets_per_street.values()) / len(request.max_bets_per_street.values())
+        max_bets = request.max_bets_per_street
+        avg_max_bets = sum(max_bets.values()) / len(max_bets) if max_bets else 0
         
         # Rough estimation: nodes ≈ (bet_sizes * max_bets) ^ depth
         estimated_nodes = int((avg_bet_sizes * avg_max_bets) ** 3)  # 3 levels deep
@@ -265,24 +287,16 @@ class ComprehensiveSolverService:
         
         return min(base_iterations, 1000000)  # Cap at 1M iterations
     
-    def _calculate_pot_odds_from_history(self, history: List[Action], pot_size: float) -> float:
-        """Calculate pot odds from action history."""
-        if not history:
-            return float('inf')
-        
-        # Find the last bet
-        for action in reversed(history):
-            if action.type == "bet":
-                return pot_size / action.size
-        
-        return float('inf')
+    def _calculate_pot_odds_from_history(self, last_bet_size: float, pot_size: float) -> float:
+        """Calculate pot odds against the last bet of a history, sized 0 if there was none."""
+        return pot_size / last_bet_size if last_bet_size > 0 else float('inf')
     
     def get_solver_status(self) -> Dict:
         """Get comprehensive solver status."""
         return {
             "status": "healthy",
             "iterations": self.solver.iterations,
-            "nodes_count": len(self.solver.nodes),
+            "nodes_count": self.solver.num_nodes,
             "convergence_history_length": len(self.solver.convergence_history),
             "last_convergence": self.solver.convergence_history[-1]['convergence'] if self.solver.convergence_history else None
         } 
\ No newline at end of file
@@ -1,5 +1,7 @@
 """Solver service for handling poker GTO calculations."""
 import time
+import threading
+from functools import lru_cache
 from typing import Dict
 from models.enums import Position
 from models.game_models import Action
@@ -8,25 +10,42 @@ from core.poker_range import PokerRange
 from cfr.cfr_solver import CFRSolver
 
 
+@lru_cache(maxsize=4)
+def _get_solver(use_gpu: bool) -> CFRSolver:
+    """Warm CFRSolver for a backend, reused across requests."""
+    return CFRSolver(use_gpu=use_gpu)
+
+
+# One lock per cached solver, keyed like _get_solver and shared by every service instance
+_SOLVER_LOCKS: Dict[bool, threading.Lock] = {False: threading.Lock(), True: threading.Lock()}
+
+
 class SolverService:
     """Service for handling poker solver operations."""
     
     def __init__(self):
-        self.solver = CFRSolver()
+        self.solver = _get_solver(False)
     
     def solve_scenario(self, request: SolverRequest) -> SolverResponse:
-        """Solve a poker scenario using CFR."""
+        """Solve a poker scenario using CFR.
+        
+        Safe to call from worker threads: requests sharing a solver are
+        serialized on that solver's lock.
+        """
+        use_gpu = bool(request.use_gpu)
+        with _SOLVER_LOCKS[use_gpu]:
+            return self._solve(_get_solver(use_gpu), request)
+    
+    def _solve(self, solver: CFRSolver, request: SolverRequest) -> SolverResponse:
+        """Train the given solver on a scenario and collect strategies."""
         start_time = time.time()
         
         # Parse ranges
-        oop_range = PokerRange()
-        ip_range = PokerRange()
-        
-        oop_range.set_range_from_string(request.oop_range)
-        ip_range.set_range_from_string(request.ip_range)
+        oop_range = PokerRange.from_string(request.oop_range)
+        ip_range = PokerRange.from_string(request.ip_range)
         
         # Train solver
-        self.solver.train(
+        solver.train(
             oop_range=oop_range,
             ip_range=ip_range,
             pot=request.pot_size,
@@ -42,17 +61,17 @@ class SolverService:
         ip_strategies = {}
         
         for hand in oop_hands:
-            oop_strategies[hand] = self.solver.get_strategy_for_hand(hand, [], Position.OOP)
+            oop_strategies[hand] = solver.get_strategy_for_hand(hand, [], Position.OOP)
         
         for hand in ip_hands:
-            ip_strategies[hand] = self.solver.get_strategy_for_hand(hand, [], Position.IP)
+            ip_strategies[hand] = solver.get_strategy_for_hand(hand, [], Position.IP)
         
         computation_time = time.time() - start_time
         
         return SolverResponse(
             oop_strategy=oop_strategies,
             ip_strategy=ip_strategies,
-            training_iterations=self.solver.iterations,
+            training_iterations=solver.iterations,
             computation_time=computation_time
         )
     
@@ -61,5 +80,5 @@ class SolverService:
         return {
             "status": "healthy",
             "iterations": self.solver.iterations,
-            "nodes_count": len(self.solver.nodes)
+            "nodes_count": self.solver.get_node_count()
         } 
\ No newline at end of file
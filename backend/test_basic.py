@@ -71,7 +71,8 @@ def test_basic_functionality():
         # Test CFR node
         node = CFRNode("test", ["check", "bet"])
         strategy = node.get_strategy(1.0)
-        assert "check" in strategy, "Check action not in strategy"
+        assert len(strategy) == 2, "Strategy should have one entry per action"
+        assert abs(strategy.sum() - 1.0) < 1e-9, "Strategy should sum to 1"
         print("✓ CFR node working")
         
         print("🎉 Basic functionality tests passed!")
@@ -81,6 +82,27 @@ def test_basic_functionality():
         print(f"❌ Functionality test error: {e}")
         return False
 
+def test_strategy_after_history():
+    """Test that a trained strategy can be looked up below the root."""
+    from cfr.cfr_solver import CFRSolver
+    from core.poker_range import PokerRange
+    from models.enums import Position
+    from models.game_models import CHECK
+    
+    oop_range = PokerRange()
+    oop_range.set_range_from_string("AA,KK,AKs")
+    ip_range = PokerRange()
+    ip_range.set_range_from_string("QQ,AQs,98s")
+    solver = CFRSolver()
+    solver.train(oop_range, ip_range, 10, 100, 2, 2000)
+    
+    # IP acts after an OOP check, so this reads a trained non-root node
+    strategy = solver.get_strategy_for_hand("QQ", [CHECK], Position.IP)
+    node = solver.node_by_history[solver.get_history_hash([CHECK])]
+    assert list(strategy) == solver.tree.action_labels[node], f"Unexpected actions: {strategy}"
+    assert abs(sum(strategy.values()) - 1.0) < 1e-6, "Strategy should sum to 1"
+    print("✓ Strategy lookup after a history working")
+
 if __name__ == "__main__":
     print("Testing modular backend structure...\n")
     
@@ -88,6 +110,7 @@ if __name__ == "__main__":
     if import_success:
         functionality_success = test_basic_functionality()
         if functionality_success:
+            test_strategy_after_history()
             print("\n✅ All tests passed! The modular backend is working correctly.")
         else:
             print("\n❌ Functionality tests failed.")
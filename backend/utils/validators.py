@@ -1,7 +1,11 @@
 """Validation utilities for the poker application."""
+import re
 from typing import List
 from models.enums import Position, ActionType
 
+# Characters a range string may contain, in either case
+_RANGE_RE = re.compile(r'[A-Za-z0-9,+\-:]+')
+
 
 def validate_range_string(range_str: str) -> bool:
     """Validate poker range string format."""
@@ -9,8 +13,7 @@ def validate_range_string(range_str: str) -> bool:
         return False
     
     # Basic validation - could be expanded
-    valid_chars = set('ABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789,+-:so')
-    return all(c.upper() in valid_chars for c in range_str)
+    return _RANGE_RE.fullmatch(range_str) is not None
 
 
 def validate_game_parameters(pot_size: float, stack_size: float, max_bets: int) -> List[str]: